@@ -1,70 +1,165 @@
 """Admin PIN authentication for AutoSync settings protection."""
 
 import hashlib
+import heapq
 import os
+import random
 import secrets
+import threading
 import time
+from collections import OrderedDict
 
-from config import _load_user_config, save_user_config
+from config import _load_user_config, _user_config_signature, save_user_config
 
-# In-memory session tokens: {token: expiry_timestamp}
-_sessions = {}
+# In-memory session tokens: {token: expiry_timestamp}, least recently used first
+_sessions = OrderedDict()
+# Min-heap of (expiry_timestamp, token) for cheap expiry sweeps
+_expiry_heap = []
+_sessions_lock = threading.Lock()
+
+# Maximum number of live sessions; the least recently used is evicted beyond this
+MAX_SESSIONS = 1024
+
+# Expired-session sweeps run at most every SWEEP_INTERVAL seconds, or with
+# probability SWEEP_PROBABILITY per validation, or when above SWEEP_SOFT_LIMIT
+SWEEP_INTERVAL = 60
+SWEEP_PROBABILITY = 0.01
+SWEEP_SOFT_LIMIT = 256
+_last_sweep = 0.0
+
+# Cached is_pin_set() answer; None means unknown
+_pin_set_cache = None
+# Cached (config_signature, (pin_hash, pin_salt, pin_iterations))
+_pin_record_cache = None
 
 # Session lifetime in seconds (30 minutes)
 SESSION_LIFETIME = 30 * 60
 
+# Random bytes per session token; token_urlsafe encodes 24 bytes as 32 chars
+SESSION_TOKEN_BYTES = 24
+_SESSION_TOKEN_LEN = 32
+
+# PBKDF2-HMAC-SHA256 work factor for new PIN hashes
+PIN_HASH_ITERATIONS = 200_000
+
+
+def invalidate_pin_cache():
+    """Forget cached PIN data; call after anything rewrites the stored PIN."""
+    global _pin_set_cache, _pin_record_cache
+    _pin_set_cache = None
+    _pin_record_cache = None
+
+
+def _load_pin_record():
+    """Return (pin_hash, pin_salt, pin_iterations), re-reading config only when it changed."""
+    global _pin_record_cache
+    signature = _user_config_signature()
+    cached = _pin_record_cache
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    cfg = _load_user_config()
+    record = (cfg.get("pin_hash"), cfg.get("pin_salt"), cfg.get("pin_iterations"))
+    _pin_record_cache = (signature, record)
+    return record
+
 
 def is_pin_set():
     """Check if an admin PIN has been configured."""
-    cfg = _load_user_config()
-    return bool(cfg.get("pin_hash"))
+    global _pin_set_cache
+    if _pin_set_cache is None:
+        _pin_set_cache = bool(_load_pin_record()[0])
+    return _pin_set_cache
+
+
+def _hash_pin(pin, salt, iterations):
+    """Derive a PIN hash with PBKDF2-HMAC-SHA256."""
+    return hashlib.pbkdf2_hmac("sha256", pin.encode("utf-8"), salt, iterations).hex()
 
 
 def set_pin(pin):
     """Hash and store a new admin PIN."""
-    salt = secrets.token_hex(16)
-    pin_hash = hashlib.sha256((salt + pin).encode()).hexdigest()
-    save_user_config({"pin_hash": pin_hash, "pin_salt": salt})
+    global _pin_set_cache
+    salt = secrets.token_bytes(16)
+    pin_hash = _hash_pin(pin, salt, PIN_HASH_ITERATIONS)
+    save_user_config({
+        "pin_hash": pin_hash,
+        "pin_salt": salt.hex(),
+        "pin_iterations": PIN_HASH_ITERATIONS,
+    })
+    invalidate_pin_cache()
+    _pin_set_cache = True
 
 
 def verify_pin(pin):
     """Verify a PIN against the stored hash. Returns True if correct."""
-    cfg = _load_user_config()
-    stored_hash = cfg.get("pin_hash")
-    salt = cfg.get("pin_salt")
+    stored_hash, salt, iterations = _load_pin_record()
     if not stored_hash or not salt:
         return False
-    candidate = hashlib.sha256((salt + pin).encode()).hexdigest()
+
+    if iterations is None:
+        # Legacy single-pass salted SHA-256 — upgrade on successful login
+        candidate = hashlib.sha256((salt + pin).encode()).hexdigest()
+        if not secrets.compare_digest(candidate, stored_hash):
+            return False
+        set_pin(pin)
+        return True
+
+    try:
+        candidate = _hash_pin(pin, bytes.fromhex(salt), int(iterations))
+    except (ValueError, TypeError):
+        return False
     return secrets.compare_digest(candidate, stored_hash)
 
 
 def generate_session_token():
     """Create a new session token valid for SESSION_LIFETIME seconds."""
-    _cleanup_expired()
-    token = secrets.token_hex(32)
-    _sessions[token] = time.time() + SESSION_LIFETIME
+    token = secrets.token_urlsafe(SESSION_TOKEN_BYTES)
+    now = time.time()
+    expiry = now + SESSION_LIFETIME
+    with _sessions_lock:
+        if len(_sessions) > SWEEP_SOFT_LIMIT:
+            _cleanup_expired(now)
+        _sessions[token] = expiry
+        heapq.heappush(_expiry_heap, (expiry, token))
+        while len(_sessions) > MAX_SESSIONS:
+            _sessions.popitem(last=False)
     return token
 
 
 def validate_session(token):
     """Check if a session token is valid and not expired."""
-    if not token:
+    # Reject malformed tokens before hashing them for the table lookup
+    if not token or len(token) != _SESSION_TOKEN_LEN:
         return False
-    _cleanup_expired()
-    expiry = _sessions.get(token)
-    if expiry is None:
-        return False
-    return time.time() < expiry
+    now = time.time()
+    with _sessions_lock:
+        if now - _last_sweep > SWEEP_INTERVAL or random.random() < SWEEP_PROBABILITY:
+            _cleanup_expired(now)
+        expiry = _sessions.get(token)
+        if expiry is None or now >= expiry:
+            return False
+        _sessions.move_to_end(token)
+        return True
 
 
 def clear_session(token):
     """Invalidate a session token (lock)."""
-    _sessions.pop(token, None)
+    with _sessions_lock:
+        _sessions.pop(token, None)
 
 
-def _cleanup_expired():
-    """Remove expired tokens from memory."""
-    now = time.time()
-    expired = [t for t, exp in _sessions.items() if now >= exp]
-    for t in expired:
-        del _sessions[t]
+def cleanup_expired_sessions():
+    """Drop all expired session tokens now."""
+    with _sessions_lock:
+        _cleanup_expired(time.time())
+
+
+def _cleanup_expired(now):
+    """Pop expired tokens off the expiry heap. Caller must hold _sessions_lock."""
+    global _last_sweep
+    _last_sweep = now
+    while _expiry_heap and _expiry_heap[0][0] <= now:
+        expiry, token = heapq.heappop(_expiry_heap)
+        # Skip heap entries for tokens already evicted, cleared or re-issued
+        if _sessions.get(token) == expiry:
+            del _sessions[token]
@@ -7,18 +7,40 @@ import os
 import queue
 import sys
 import threading
-from datetime import datetime, timezone
+import time
 
 from flask import Flask, Response, jsonify, redirect, render_template, request
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.local import LocalProxy
 
 import admin_pin
 import config as cfg
 from config import save_user_config
 from log_handler import sse_handler
 from onedrive_api import get_api_base, validate_share_link
-from state_db import load_state
+from state_db import load_state, state_signature
 from sync_manager import SyncManager
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import sync_history
+except ImportError:
+    sync_history = None
+
+try:
+    import health_monitor
+except ImportError:
+    health_monitor = None
+
+try:
+    import webhook_manager
+except ImportError:
+    webhook_manager = None
+
 # ---------------------------------------------------------------------------
 # Logging setup — attach SSE handler to root logger
 # ---------------------------------------------------------------------------
@@ -40,8 +62,67 @@ def _resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, deferring to the stdlib for types it rejects."""
+
+    def dumps(self, obj, **kwargs):
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response, skipping the str round trip
+        obj = self._prepare_response_obj(args, kwargs)
+        try:
+            body = orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+        except TypeError:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
 app = Flask(__name__, template_folder=_resource_path("templates"))
-manager = SyncManager()
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def _get_manager():
+    """Create the SyncManager on first use."""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = SyncManager()
+    return _manager
+
+
+manager = LocalProxy(_get_manager)
+
+
+# ---------------------------------------------------------------------------
+# Pre-serialized bodies for constant JSON responses on hot endpoints
+# ---------------------------------------------------------------------------
+_OK_BODY = json.dumps({"ok": True})
+_PIN_NOT_SET_BODY = json.dumps({"ok": False, "error": "PIN not set"})
+_UNAUTHORIZED_BODY = json.dumps({"ok": False, "error": "Unauthorized"})
+_PIN_SET_BODIES = {
+    True: json.dumps({"pin_set": True}),
+    False: json.dumps({"pin_set": False}),
+}
+_INSTALLED_BODIES = {
+    True: json.dumps({"installed": True}),
+    False: json.dumps({"installed": False}),
+}
+
+
+def _json_response(body, status=200):
+    """Wrap a pre-serialized JSON body in a fresh Response."""
+    return Response(body, status=status, mimetype="application/json")
 
 
 # ---------------------------------------------------------------------------
@@ -66,10 +147,10 @@ def api_status():
 def _require_admin():
     """Check X-Admin-Token header. Returns error response or None if OK."""
     if not admin_pin.is_pin_set():
-        return jsonify({"ok": False, "error": "PIN not set"}), 401
+        return _json_response(_PIN_NOT_SET_BODY, 401)
     token = request.headers.get("X-Admin-Token", "")
     if not admin_pin.validate_session(token):
-        return jsonify({"ok": False, "error": "Unauthorized"}), 401
+        return _json_response(_UNAUTHORIZED_BODY, 401)
     return None
 
 
@@ -78,7 +159,7 @@ def _require_admin():
 # ---------------------------------------------------------------------------
 @app.route("/api/admin/status")
 def api_admin_status():
-    return jsonify({"pin_set": admin_pin.is_pin_set()})
+    return _json_response(_PIN_SET_BODIES[admin_pin.is_pin_set()])
 
 
 @app.route("/api/admin/set-pin", methods=["POST"])
@@ -113,7 +194,7 @@ def api_admin_verify():
 def api_admin_lock():
     token = request.headers.get("X-Admin-Token", "")
     admin_pin.clear_session(token)
-    return jsonify({"ok": True})
+    return _json_response(_OK_BODY)
 
 
 # ---------------------------------------------------------------------------
@@ -140,6 +221,30 @@ def api_config_get():
     })
 
 
+def _parse_list(value):
+    """Accept a list as-is, or split a newline-separated string into stripped lines."""
+    if isinstance(value, str):
+        return [line.strip() for line in value.split("\n") if line.strip()]
+    return value
+
+
+# Accepted /api/config fields: (key, coerce, error on bad input — None skips the field)
+_CONFIG_FIELDS = (
+    ("share_link", str.strip, "Invalid share link"),
+    ("local_folder", str.strip, "Invalid local folder"),
+    ("client_id", str.strip, "Invalid client ID"),
+    ("tenant_id", str.strip, "Invalid tenant ID"),
+    ("poll_interval", int, "Invalid poll interval"),
+    ("ignore_patterns", _parse_list, None),
+    ("sync_folders", _parse_list, None),
+    ("exclude_folders", _parse_list, None),
+    ("notifications_enabled", bool, None),
+    ("max_workers", lambda v: max(1, int(v)), None),
+    ("webhook_enabled", bool, None),
+    ("webhook_url", str.strip, "Invalid webhook URL"),
+)
+
+
 @app.route("/api/config", methods=["POST"])
 def api_config_set():
     err = _require_admin()
@@ -150,114 +255,173 @@ def api_config_set():
 
     data = request.get_json(force=True)
     updates = {}
-
-    if "share_link" in data:
-        updates["share_link"] = data["share_link"].strip()
-    if "local_folder" in data:
-        updates["local_folder"] = data["local_folder"].strip()
-    if "client_id" in data:
-        updates["client_id"] = data["client_id"].strip()
-    if "tenant_id" in data:
-        updates["tenant_id"] = data["tenant_id"].strip()
-    if "poll_interval" in data:
+    for key, coerce, error in _CONFIG_FIELDS:
+        if key not in data:
+            continue
         try:
-            updates["poll_interval"] = int(data["poll_interval"])
-        except (ValueError, TypeError):
-            return jsonify({"ok": False, "error": "Invalid poll interval"}), 400
-    if "ignore_patterns" in data:
-        patterns = data["ignore_patterns"]
-        if isinstance(patterns, str):
-            patterns = [p.strip() for p in patterns.split("\n") if p.strip()]
-        updates["ignore_patterns"] = patterns
-    if "sync_folders" in data:
-        folders = data["sync_folders"]
-        if isinstance(folders, str):
-            folders = [f.strip() for f in folders.split("\n") if f.strip()]
-        updates["sync_folders"] = folders
-    if "exclude_folders" in data:
-        folders = data["exclude_folders"]
-        if isinstance(folders, str):
-            folders = [f.strip() for f in folders.split("\n") if f.strip()]
-        updates["exclude_folders"] = folders
-    if "notifications_enabled" in data:
-        updates["notifications_enabled"] = bool(data["notifications_enabled"])
-    if "max_workers" in data:
-        try:
-            updates["max_workers"] = max(1, int(data["max_workers"]))
-        except (ValueError, TypeError):
-            pass
-    if "webhook_enabled" in data:
-        updates["webhook_enabled"] = bool(data["webhook_enabled"])
-    if "webhook_url" in data:
-        updates["webhook_url"] = data["webhook_url"].strip()
-
+            updates[key] = coerce(data[key])
+        except (ValueError, TypeError, AttributeError):
+            if error:
+                return jsonify({"ok": False, "error": error}), 400
+
+    # Only persist values that differ from what is already stored
+    current = cfg._load_user_config()
+    updates = {k: v for k, v in updates.items() if k not in current or current[k] != v}
     if updates:
-        save_user_config(updates)
-        cfg.reload_config()
+        cfg.reload_config(fresh=save_user_config(updates))
+        _invalidate_conflicts_cache()
+        _invalidate_validated_links()
 
-    return jsonify({"ok": True})
+    return _json_response(_OK_BODY)
 
 
 # ---------------------------------------------------------------------------
 # API: Files
 # ---------------------------------------------------------------------------
+# Serialized /api/files body chunks, keyed by the state snapshot and log stat signatures
+_files_cache = {"key": None, "body": None}
+_files_cache_lock = threading.Lock()
+
+
 @app.route("/api/files")
 def api_files():
+    signature = state_signature(cfg.STATE_DB_PATH)
+    # No signature while neither file exists; don't cache the empty listing
+    key = (cfg.STATE_DB_PATH, signature) if any(signature) else None
+    with _files_cache_lock:
+        if key is not None and _files_cache["key"] == key:
+            return _json_response(_files_cache["body"])
+
     try:
         state = load_state(cfg.STATE_DB_PATH)
     except Exception as e:
         return jsonify({"files": [], "error": str(e)})
 
-    files = []
-    for path, entry in sorted(state.get("files", {}).items()):
-        files.append({
+    return _json_response(_stream_files_json(state.get("files", {}), key))
+
+
+def _stream_files_json(files, key):
+    """Stream the /api/files body, caching its chunks once the last one is sent.
+
+    The cached value is the chunk list itself, so no joined copy is built. A
+    client that disconnects early closes the generator before the cache is
+    written, so a partial body is never stored.
+    """
+    chunks = []
+    for chunk in _iter_files_json(files):
+        chunks.append(chunk)
+        yield chunk
+    if key is not None:
+        with _files_cache_lock:
+            _files_cache["key"] = key
+            _files_cache["body"] = chunks
+
+
+def _iter_files_json(files, batch_size=512):
+    """Yield the /api/files JSON in chunks of batch_size entries, sorted by path.
+
+    _stream_files_json sends each chunk as it is produced, so the response
+    starts before the whole listing is serialized.
+    """
+    dumps = app.json.dumps
+    batch = ['{"files":[']
+    sep = ""
+    for path in sorted(files):
+        entry = files[path]
+        batch.append(sep + dumps({
             "path": path,
             "size": entry.get("size", 0),
             "local_mtime": entry.get("local_mtime", ""),
             "remote_mtime": entry.get("remote_mtime", ""),
             "synced_at": entry.get("synced_at", ""),
-        })
-    return jsonify({"files": files})
+        }))
+        sep = ","
+        if len(batch) >= batch_size:
+            yield "".join(batch)
+            batch = []
+    batch.append("]}")
+    yield "".join(batch)
 
 
 # ---------------------------------------------------------------------------
 # API: Conflicts
 # ---------------------------------------------------------------------------
+_ISO_UTC_FMT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+# Last conflict scan, refreshed by the maintenance thread; None forces a rescan
+_conflicts_cache = None
+
+
 @app.route("/api/conflicts")
 def api_conflicts():
+    conflicts = _conflicts_cache
+    if conflicts is None:
+        conflicts = _refresh_conflicts_cache()
+    return jsonify({"conflicts": conflicts})
+
+
+def _refresh_conflicts_cache():
+    """Rescan LOCAL_FOLDER for conflict files and store the result."""
+    global _conflicts_cache
     conflicts = []
     local = cfg.LOCAL_FOLDER
-    if not os.path.isdir(local):
-        return jsonify({"conflicts": []})
-
-    for root, _dirs, filenames in os.walk(local):
-        for fname in filenames:
-            if cfg.CONFLICT_SUFFIX in fname:
-                full_path = os.path.join(root, fname)
-                rel_path = os.path.relpath(full_path, local).replace(os.sep, "/")
-                try:
-                    stat = os.stat(full_path)
-                    conflicts.append({
-                        "path": rel_path,
-                        "original": _guess_original(fname),
-                        "size": stat.st_size,
-                        "mtime": datetime.fromtimestamp(
-                            stat.st_mtime, tz=timezone.utc
-                        ).isoformat(),
-                    })
-                except OSError:
-                    pass
+    if os.path.isdir(local):
+        for rel_path, fname, idx, stat in _iter_conflicts(local, cfg.EXCLUDE_FOLDER_SET):
+            conflicts.append({
+                "path": rel_path,
+                "original": _guess_original(fname, idx),
+                "size": stat.st_size,
+                "mtime": time.strftime(_ISO_UTC_FMT, time.gmtime(stat.st_mtime)),
+            })
+    _conflicts_cache = conflicts
+    return conflicts
+
+
+def _iter_conflicts(root, excluded):
+    """Yield (rel_path, fname, suffix_idx, stat) for conflict files below root.
+
+    Walks with os.scandir over an explicit stack so directory entries carry
+    cached type info, and skips excluded folders instead of descending.
+    """
+    suffix = cfg.CONFLICT_SUFFIX
+    stack = [(root, "")]
+    while stack:
+        dir_path, rel_dir = stack.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        # Build child paths by concatenating onto a per-directory prefix
+        rel_prefix = rel_dir + "/" if rel_dir else ""
+        for entry in entries:
+            rel_path = rel_prefix + entry.name
+            try:
+                if entry.is_dir():
+                    if not entry.is_symlink() and rel_path not in excluded:
+                        stack.append((entry.path, rel_path))
+                else:
+                    # One scan finds the marker and hands its offset to _guess_original
+                    idx = entry.name.find(suffix)
+                    if idx != -1:
+                        yield rel_path, entry.name, idx, entry.stat()
+            except OSError:
+                pass
 
-    return jsonify({"conflicts": conflicts})
 
+def _guess_original(fname, idx=None):
+    """Try to reconstruct the original filename from a conflict filename.
 
-def _guess_original(fname):
-    """Try to reconstruct the original filename from a conflict filename."""
-    idx = fname.find(cfg.CONFLICT_SUFFIX)
+    idx is the offset of CONFLICT_SUFFIX in fname, if already known.
+    """
+    suffix = cfg.CONFLICT_SUFFIX
+    if idx is None:
+        idx = fname.find(suffix)
     if idx == -1:
         return fname
     base = fname[:idx]
-    rest = fname[idx + len(cfg.CONFLICT_SUFFIX):]
+    rest = fname[idx + len(suffix):]
     dot = rest.rfind(".")
     ext = rest[dot:] if dot != -1 else ""
     return base + ext
@@ -290,6 +454,24 @@ def api_sync_trigger():
 # ---------------------------------------------------------------------------
 # API: Validate share link
 # ---------------------------------------------------------------------------
+# Share-link probe results: {api_base: (expiry_timestamp, valid)}
+_validated_links = {}
+_validated_links_lock = threading.Lock()
+_VALIDATED_LINK_TTL = 60
+
+
+def _prune_validated_links(now):
+    """Drop expired entries from the validated-link cache."""
+    with _validated_links_lock:
+        for stale in [k for k, (exp, _) in _validated_links.items() if exp <= now]:
+            del _validated_links[stale]
+
+
+def _invalidate_validated_links():
+    with _validated_links_lock:
+        _validated_links.clear()
+
+
 @app.route("/api/validate-link")
 def api_validate_link():
     link = request.args.get("url", "").strip()
@@ -297,7 +479,15 @@ def api_validate_link():
         return jsonify({"valid": False, "error": "No URL provided"})
     try:
         api_base = get_api_base(link)
+        now = time.time()
+        with _validated_links_lock:
+            cached = _validated_links.get(api_base)
+        if cached is not None and cached[0] > now:
+            return jsonify({"valid": cached[1]})
         valid = validate_share_link(api_base)
+        _prune_validated_links(now)
+        with _validated_links_lock:
+            _validated_links[api_base] = (now + _VALIDATED_LINK_TTL, valid)
         return jsonify({"valid": valid})
     except Exception as e:
         return jsonify({"valid": False, "error": str(e)})
@@ -319,7 +509,7 @@ def auth_login():
     # Verify admin token from query param (browser redirect can't send headers)
     token = request.args.get("admin_token", "")
     if admin_pin.is_pin_set() and not admin_pin.validate_session(token):
-        return jsonify({"ok": False, "error": "Unauthorized"}), 401
+        return _json_response(_UNAUTHORIZED_BODY, 401)
     redirect_uri = request.url_root.rstrip("/") + "/auth/callback"
     url = auth.get_auth_url(redirect_uri)
     if url is None:
@@ -345,7 +535,7 @@ def auth_logout():
     if err:
         return err
     auth.logout()
-    return jsonify({"ok": True})
+    return _json_response(_OK_BODY)
 
 
 @app.route("/api/auth/status")
@@ -362,22 +552,34 @@ def api_auth_status():
 # ---------------------------------------------------------------------------
 # API: SSE log stream
 # ---------------------------------------------------------------------------
+# Send a keepalive comment after this many seconds without stream output,
+# inside the ~30s window after which clients and proxies drop idle streams
+_SSE_KEEPALIVE_SECONDS = 25
+
+
 @app.route("/api/logs/stream")
 def api_logs_stream():
+    # Each open stream pins a server thread; the handler caps how many exist
+    q = sse_handler.subscribe()
+    if q is None:
+        return jsonify({"error": "Too many log stream connections"}), 503
+
     def generate():
-        q = sse_handler.subscribe()
-        try:
-            while True:
-                try:
-                    entry = q.get(timeout=30)
-                    data = json.dumps(entry)
-                    yield f"data: {data}\n\n"
-                except queue.Empty:
+        last_write = time.monotonic()
+        while True:
+            # Wait only until a keepalive is actually due
+            wait = _SSE_KEEPALIVE_SECONDS - (time.monotonic() - last_write)
+            try:
+                # Coalesce everything already queued into a single write
+                entries = q.get_batch(timeout=max(wait, 0.1))
+                yield "".join(f"data: {app.json.dumps(entry)}\n\n" for entry in entries)
+                last_write = time.monotonic()
+            except queue.Empty:
+                if time.monotonic() - last_write >= _SSE_KEEPALIVE_SECONDS:
                     yield ": keepalive\n\n"
-        except GeneratorExit:
-            sse_handler.unsubscribe(q)
+                    last_write = time.monotonic()
 
-    return Response(
+    response = Response(
         generate(),
         mimetype="text/event-stream",
         headers={
@@ -385,19 +587,36 @@ def api_logs_stream():
             "X-Accel-Buffering": "no",
         },
     )
+    # Release the subscriber slot even if the generator never started
+    response.call_on_close(lambda: sse_handler.unsubscribe(q))
+    return response
 
 
 # ---------------------------------------------------------------------------
 # API: Sync History
 # ---------------------------------------------------------------------------
+# Recently served history pages: {(limit, offset): (expires_monotonic, body)}
+_history_cache = {}
+_HISTORY_CACHE_TTL = 2
+
+
 @app.route("/api/history")
 def api_history():
+    if sync_history is None:
+        return jsonify({"history": [], "error": "unavailable"}), 503
     try:
-        import sync_history
         limit = int(request.args.get("limit", 50))
         offset = int(request.args.get("offset", 0))
+        now = time.monotonic()
+        cached = _history_cache.get((limit, offset))
+        if cached is not None and cached[0] > now:
+            return _json_response(cached[1])
         entries = sync_history.get_history(limit=limit, offset=offset)
-        return jsonify({"history": entries})
+        body = app.json.dumps({"history": entries})
+        if len(_history_cache) >= 32:
+            _history_cache.clear()
+        _history_cache[(limit, offset)] = (now + _HISTORY_CACHE_TTL, body)
+        return _json_response(body)
     except Exception as e:
         return jsonify({"history": [], "error": str(e)})
 
@@ -407,8 +626,9 @@ def api_history():
 # ---------------------------------------------------------------------------
 @app.route("/api/health")
 def api_health():
+    if health_monitor is None:
+        return jsonify({"error": "unavailable"}), 503
     try:
-        import health_monitor
         token_expiry = None
         if auth is not None:
             try:
@@ -426,20 +646,16 @@ def api_health():
 # ---------------------------------------------------------------------------
 import platform as _platform
 
-def _get_autostart_module():
-    if _platform.system() == "Windows":
-        import win_service
-        return win_service
-    else:
-        import launchd_service
-        return launchd_service
+if _platform.system() == "Windows":
+    import win_service as _autostart
+else:
+    import launchd_service as _autostart
 
 
 @app.route("/api/autostart/status")
 def api_autostart_status():
     try:
-        svc = _get_autostart_module()
-        return jsonify({"installed": svc.is_installed()})
+        return _json_response(_INSTALLED_BODIES[bool(_autostart.is_installed())])
     except Exception as e:
         return jsonify({"installed": False, "error": str(e)})
 
@@ -447,8 +663,7 @@ def api_autostart_status():
 @app.route("/api/autostart/enable", methods=["POST"])
 def api_autostart_enable():
     try:
-        svc = _get_autostart_module()
-        ok = svc.install()
+        ok = _autostart.install()
         return jsonify({"ok": ok})
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
@@ -457,8 +672,7 @@ def api_autostart_enable():
 @app.route("/api/autostart/disable", methods=["POST"])
 def api_autostart_disable():
     try:
-        svc = _get_autostart_module()
-        ok = svc.uninstall()
+        ok = _autostart.uninstall()
         return jsonify({"ok": ok})
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
@@ -475,18 +689,61 @@ def api_webhook_notify():
     if validation_token:
         return Response(validation_token, mimetype="text/plain")
 
+    if webhook_manager is None:
+        return jsonify({"ok": False, "error": "unavailable"}), 503
     try:
-        import webhook_manager
         data = request.get_json(force=True)
         changed = webhook_manager.handle_notification(data)
         if changed and manager.running:
-            manager.trigger_sync()
-        return jsonify({"ok": True})
+            webhook_manager.schedule_sync(changed, manager.wake_poll)
+        return _json_response(_OK_BODY)
     except Exception as e:
         logger.error("Webhook notification error: %s", e)
         return jsonify({"ok": False, "error": str(e)}), 500
 
 
+# ---------------------------------------------------------------------------
+# Background maintenance
+# ---------------------------------------------------------------------------
+_MAINTENANCE_INTERVAL = 30
+_maintenance_thread = None
+_maintenance_lock = threading.Lock()
+
+
+def _invalidate_conflicts_cache():
+    global _conflicts_cache
+    _conflicts_cache = None
+
+
+def _maintenance_loop():
+    """Expire sessions and refresh cached scans off the request path."""
+    while True:
+        time.sleep(_MAINTENANCE_INTERVAL)
+        try:
+            admin_pin.cleanup_expired_sessions()
+            _prune_validated_links(time.time())
+            _refresh_conflicts_cache()
+        except Exception as e:
+            logger.debug("Maintenance pass failed: %s", e)
+
+
+def _start_maintenance():
+    """Start the maintenance thread once per process."""
+    global _maintenance_thread
+    with _maintenance_lock:
+        if _maintenance_thread is None:
+            _maintenance_thread = threading.Thread(
+                target=_maintenance_loop, name="maintenance", daemon=True)
+            _maintenance_thread.start()
+
+
+@app.before_request
+def _ensure_maintenance():
+    # Covers servers that import app:app without going through _run_server
+    if _maintenance_thread is None:
+        _start_maintenance()
+
+
 # ---------------------------------------------------------------------------
 # Entry point
 # ---------------------------------------------------------------------------
@@ -514,7 +771,6 @@ def _start_background_server():
         start_new_session=True,
     )
     # Wait for server to be ready
-    import time
     for _ in range(30):
         if _server_is_running():
             return True
@@ -522,6 +778,20 @@ def _start_background_server():
     return False
 
 
+def _run_server(host="localhost", port=8050):
+    """Serve the app with waitress; AUTOSYNC_DEV=1 forces the Werkzeug dev server."""
+    _start_maintenance()
+    try:
+        if os.environ.get("AUTOSYNC_DEV"):
+            raise ImportError
+        from waitress import serve
+    except ImportError:
+        app.run(host=host, port=port, threaded=True, debug=False)
+        return
+    # Every open log stream occupies a worker; keep headroom for API requests
+    serve(app, host=host, port=port, threads=sse_handler.max_subscribers + 8)
+
+
 if __name__ == "__main__":
     import argparse
 
@@ -531,7 +801,7 @@ if __name__ == "__main__":
 
     if args.no_gui:
         logger.info("Starting AutoSync server on http://localhost:8050")
-        app.run(host="localhost", port=8050, threaded=True, debug=False)
+        _run_server()
     else:
         # Ensure background server is running
         if not _server_is_running():
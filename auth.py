@@ -3,6 +3,8 @@
 import json
 import logging
 import os
+import tempfile
+import threading
 
 import msal
 
@@ -17,11 +19,47 @@ SCOPES = ["Files.ReadWrite.All", "Sites.ReadWrite.All"]
 # Module-level state for the in-progress auth flow
 _auth_flow = None
 
+# Shared MSAL app + token cache, rebuilt only when settings or the cache file change
+_app_lock = threading.Lock()
+_app_state = {"key": None, "app": None, "cache": None}
+
+
+def _cache_path():
+    return getattr(cfg, "TOKEN_CACHE_PATH", os.path.join(_DIR, ".token_cache.json"))
+
+
+def _cache_signature(cache_path):
+    """Return (mtime_ns, size) of the token cache file, or None if missing."""
+    try:
+        st = os.stat(cache_path)
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+
+def _app_key(cache_path):
+    return (
+        getattr(cfg, "CLIENT_ID", ""),
+        getattr(cfg, "TENANT_ID", "common"),
+        cache_path,
+        _cache_signature(cache_path),
+    )
+
+
+def _get_app_and_cache():
+    """Return the shared (app, cache) pair; app is None without a client ID."""
+    key = _app_key(_cache_path())
+    with _app_lock:
+        if _app_state["key"] != key:
+            cache = _get_cache()
+            _app_state.update(key=key, app=_get_app(cache), cache=cache)
+        return _app_state["app"], _app_state["cache"]
+
 
 def _get_cache():
     """Load the MSAL serializable token cache from disk."""
     cache = msal.SerializableTokenCache()
-    cache_path = getattr(cfg, "TOKEN_CACHE_PATH", os.path.join(_DIR, ".token_cache.json"))
+    cache_path = _cache_path()
     if os.path.exists(cache_path):
         try:
             with open(cache_path, "r", encoding="utf-8") as f:
@@ -34,9 +72,27 @@ def _get_cache():
 def _save_cache(cache):
     """Persist the MSAL token cache to disk."""
     if cache.has_state_changed:
-        cache_path = getattr(cfg, "TOKEN_CACHE_PATH", os.path.join(_DIR, ".token_cache.json"))
-        with open(cache_path, "w", encoding="utf-8") as f:
-            f.write(cache.serialize())
+        cache_path = _cache_path()
+        with _app_lock:
+            _atomic_write(cache_path, cache.serialize())
+            # Our own write should not force the shared app to be rebuilt
+            if _app_state["cache"] is cache:
+                _app_state["key"] = _app_key(cache_path)
+
+
+def _atomic_write(path, text):
+    """Write text to path via a temp file + os.replace() so readers never see a partial file."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
 
 
 def _get_app(cache=None):
@@ -59,8 +115,7 @@ def get_auth_url(redirect_uri):
     The caller should redirect the user's browser to this URL.
     """
     global _auth_flow
-    cache = _get_cache()
-    app = _get_app(cache)
+    app, cache = _get_app_and_cache()
     if app is None:
         return None
     _auth_flow = app.initiate_auth_code_flow(SCOPES, redirect_uri=redirect_uri)
@@ -83,8 +138,7 @@ def complete_auth(auth_response):
     if _auth_flow is None:
         logger.error("No auth flow in progress")
         return None
-    cache = _get_cache()
-    app = _get_app(cache)
+    app, cache = _get_app_and_cache()
     if app is None:
         return None
     result = app.acquire_token_by_auth_code_flow(_auth_flow, auth_response)
@@ -105,8 +159,7 @@ def get_access_token(force_refresh=False):
 
     Returns the token string, or None if not authenticated.
     """
-    cache = _get_cache()
-    app = _get_app(cache)
+    app, cache = _get_app_and_cache()
     if app is None:
         return None
     accounts = app.get_accounts()
@@ -123,8 +176,7 @@ def get_access_token(force_refresh=False):
 
 def get_token_expiry():
     """Return seconds until token expires, or None if unavailable."""
-    cache = _get_cache()
-    app = _get_app(cache)
+    app, cache = _get_app_and_cache()
     if app is None:
         return None
     accounts = app.get_accounts()
@@ -140,8 +192,7 @@ def get_token_expiry():
 
 def is_authenticated():
     """Check whether we have a cached account (tokens may still be expired)."""
-    cache = _get_cache()
-    app = _get_app(cache)
+    app, cache = _get_app_and_cache()
     if app is None:
         return False
     return len(app.get_accounts()) > 0
@@ -149,8 +200,7 @@ def is_authenticated():
 
 def get_user_info():
     """Return basic info about the signed-in user, or None."""
-    cache = _get_cache()
-    app = _get_app(cache)
+    app, cache = _get_app_and_cache()
     if app is None:
         return None
     accounts = app.get_accounts()
@@ -165,7 +215,7 @@ def get_user_info():
 
 def logout():
     """Clear all cached tokens."""
-    cache_path = getattr(cfg, "TOKEN_CACHE_PATH", os.path.join(_DIR, ".token_cache.json"))
+    cache_path = _cache_path()
     if os.path.exists(cache_path):
         os.remove(cache_path)
         logger.info("Token cache removed")
@@ -9,12 +9,11 @@ import logging
 import os
 import signal
 import sys
-import time
+import threading
 
 import config as cfg
 from config import save_user_config
 from onedrive_api import get_api_base, validate_share_link
-from state_db import load_state, save_state
 from sync_engine import full_sync
 from file_watcher import start_watcher, stop_watcher
 
@@ -25,6 +24,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger("autosync")
 
+# Set by SIGINT/SIGTERM; the polling loop and the watcher worker both stop on it
+SHUTDOWN = threading.Event()
+
 
 def _prompt_setup():
     """Interactive first-run setup: prompt for share link and optional settings."""
@@ -81,43 +83,29 @@ def main():
     # 4. Create local folder if needed
     os.makedirs(cfg.LOCAL_FOLDER, exist_ok=True)
 
-    # 5. Load or create state DB
-    state = load_state(cfg.STATE_DB_PATH)
-    save_state(state, cfg.STATE_DB_PATH)
-
-    # 6. Run initial full sync
+    # 5. Run initial full sync
     logger.info("Running initial full sync...")
     full_sync(api_base)
 
-    # 7. Start file watcher (background thread)
-    observer = start_watcher(api_base)
-
-    # 8. Handle graceful shutdown
-    shutdown = False
+    # 6. Start file watcher (background thread)
+    observer = start_watcher(api_base, SHUTDOWN)
 
+    # 7. Handle graceful shutdown
     def signal_handler(signum, frame):
-        nonlocal shutdown
-        shutdown = True
+        SHUTDOWN.set()
         logger.info("Shutdown signal received, stopping...")
 
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
 
-    # 9. Polling loop
+    # 8. Polling loop — wait() returns early as soon as shutdown is signalled
     logger.info("Sync running. Press Ctrl+C to stop.")
     try:
-        while not shutdown:
-            # Sleep in small increments to allow responsive shutdown
-            for _ in range(cfg.POLL_INTERVAL):
-                if shutdown:
-                    break
-                time.sleep(1)
-
-            if not shutdown:
-                try:
-                    full_sync(api_base)
-                except Exception as e:
-                    logger.error("Full sync failed: %s", e)
+        while not SHUTDOWN.wait(cfg.POLL_INTERVAL):
+            try:
+                full_sync(api_base)
+            except Exception as e:
+                logger.error("Full sync failed: %s", e)
     finally:
         stop_watcher(observer)
         logger.info("Autosync stopped.")
@@ -1,6 +1,10 @@
+import fnmatch
 import json
 import os
 import platform
+import re
+import tempfile
+import threading
 
 _DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -19,8 +23,15 @@ os.makedirs(DATA_DIR, exist_ok=True)
 USER_CONFIG_PATH = os.path.join(DATA_DIR, "user_config.json")
 
 
-def _load_user_config():
-    """Load saved user configuration from user_config.json."""
+USER_CONFIG_JOURNAL_PATH = os.path.join(DATA_DIR, "user_config.jsonl")
+
+# Fold the journal back into user_config.json once it grows past this size
+_JOURNAL_COMPACT_BYTES = 64 * 1024
+_config_lock = threading.RLock()
+
+
+def _read_config_snapshot():
+    """Load the compacted user configuration from user_config.json."""
     if os.path.exists(USER_CONFIG_PATH):
         try:
             with open(USER_CONFIG_PATH, "r", encoding="utf-8") as f:
@@ -30,16 +41,120 @@ def _load_user_config():
     return {}
 
 
+# Last parsed configuration: (signature, data)
+_cfg_cache = (None, {})
+
+
+def _load_user_config():
+    """Load saved user configuration: the snapshot plus any journaled updates.
+
+    The parsed result is reused until the files' stat signature changes.
+    """
+    global _cfg_cache
+    signature = _user_config_signature()
+    cached_sig, cached_data = _cfg_cache
+    if cached_sig is not None and cached_sig == signature:
+        return dict(cached_data)
+    data = _read_config_snapshot()
+    try:
+        with open(USER_CONFIG_JOURNAL_PATH, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    update = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn write from an interrupted append
+                    continue
+                if isinstance(update, dict):
+                    data.update(update)
+    except OSError:
+        pass
+    _cfg_cache = (signature, data)
+    return dict(data)
+
+
+def _user_config_signature():
+    """Return a cheap (mtime, size) fingerprint of the stored user configuration."""
+    sig = []
+    for path in (USER_CONFIG_PATH, USER_CONFIG_JOURNAL_PATH):
+        try:
+            st = os.stat(path)
+            sig.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            sig.append(None)
+    return tuple(sig)
+
+
 def save_user_config(data):
-    """Save user configuration to user_config.json."""
-    existing = _load_user_config()
-    existing.update(data)
-    with open(USER_CONFIG_PATH, "w", encoding="utf-8") as f:
-        json.dump(existing, f, indent=2)
+    """Save user configuration by appending the update to the journal.
+
+    Returns the merged configuration after the update.
+    """
+    global _cfg_cache
+    with _config_lock:
+        merged = _load_user_config()
+        merged.update(data)
+        with open(USER_CONFIG_JOURNAL_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(data) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+            journal_size = f.tell()
+        if journal_size > _JOURNAL_COMPACT_BYTES:
+            _compact_user_config()
+        # Our own write is already reflected in merged; no need to re-read it
+        _cfg_cache = (_user_config_signature(), dict(merged))
+        return merged
+
+
+def _compact_user_config():
+    """Fold the journal into user_config.json and remove it."""
+    with _config_lock:
+        if not os.path.exists(USER_CONFIG_JOURNAL_PATH):
+            return
+        merged = _load_user_config()
+        fd, tmp_path = tempfile.mkstemp(dir=DATA_DIR, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(merged, f, indent=2)
+            os.replace(tmp_path, USER_CONFIG_PATH)
+        except Exception:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        # Replaying a leftover journal is harmless, so removal may lag the replace
+        os.remove(USER_CONFIG_JOURNAL_PATH)
 
 
 _DEFAULT_IGNORE = ["~$*", "*.tmp", ".DS_Store", "Thumbs.db"]
 
+
+# Sync bookkeeping files that are never synced, whatever the user patterns say
+_ALWAYS_IGNORE = ["sync_state.json", "sync_state.json.log", ".sync_state*"]
+
+
+def _compile_ignore(patterns):
+    """Compile the built-in and user fnmatch-style patterns into one anchored regex."""
+    flags = re.IGNORECASE if os.name == "nt" else 0
+    combined = list(_ALWAYS_IGNORE) + list(patterns)
+    return re.compile("|".join(f"(?:{fnmatch.translate(p)})" for p in combined), flags)
+
+
+def _folder_set(folders):
+    """Normalize a folder list into a frozenset of slash-stripped relative paths."""
+    return frozenset(f.strip().strip("/") for f in folders) - {""}
+
+
+def _folder_prefixes(folder_set):
+    """Return a tuple of "folder/" prefixes for a single str.startswith() call."""
+    return tuple(sorted(f + "/" for f in folder_set))
+
+
+try:
+    _compact_user_config()
+except OSError:
+    pass
+
 _user_cfg = _load_user_config()
 
 # Microsoft OAuth (Auth Code Flow with PKCE)
@@ -72,6 +187,9 @@ UPLOAD_CHUNK_SIZE = 10 * 1024 * 1024
 # Simple upload threshold (4 MB)
 SIMPLE_UPLOAD_MAX = 4 * 1024 * 1024
 
+# Read size for streamed downloads (1 MB)
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
 # Retry settings
 MAX_RETRIES = 3
 RETRY_BACKOFF_BASE = 1  # seconds
@@ -90,6 +208,13 @@ MAX_WORKERS = int(_user_cfg.get("max_workers", 4))
 SYNC_FOLDERS = _user_cfg.get("sync_folders", [])
 EXCLUDE_FOLDERS = _user_cfg.get("exclude_folders", [])
 
+# Precompiled forms of the above, rebuilt by reload_config()
+IGNORE_RE = _compile_ignore(IGNORE_PATTERNS)
+SYNC_FOLDER_SET = _folder_set(SYNC_FOLDERS)
+EXCLUDE_FOLDER_SET = _folder_set(EXCLUDE_FOLDERS)
+SYNC_PREFIXES = _folder_prefixes(SYNC_FOLDER_SET)
+EXCLUDE_PREFIXES = _folder_prefixes(EXCLUDE_FOLDER_SET)
+
 # Desktop notifications
 NOTIFICATIONS_ENABLED = _user_cfg.get("notifications_enabled", True)
 
@@ -97,13 +222,24 @@ NOTIFICATIONS_ENABLED = _user_cfg.get("notifications_enabled", True)
 WEBHOOK_ENABLED = _user_cfg.get("webhook_enabled", False)
 WEBHOOK_URL = _user_cfg.get("webhook_url", "")
 
+# Webhook notifications arriving within this many seconds share one sync,
+# which starts early once this many are pending
+WEBHOOK_BATCH_INTERVAL = 5
+WEBHOOK_BATCH_MAX = 64
+
+
+def reload_config(fresh=None):
+    """Reload user configuration at runtime.
 
-def reload_config():
-    """Reload user configuration from user_config.json at runtime."""
+    fresh: an already-loaded configuration dict (e.g. the return value of
+    save_user_config); read from disk when omitted.
+    """
     global SHARE_LINK, LOCAL_FOLDER, POLL_INTERVAL, CLIENT_ID, TENANT_ID
     global IGNORE_PATTERNS, MAX_WORKERS, SYNC_FOLDERS, EXCLUDE_FOLDERS
     global NOTIFICATIONS_ENABLED, WEBHOOK_ENABLED, WEBHOOK_URL
-    fresh = _load_user_config()
+    global IGNORE_RE, SYNC_FOLDER_SET, EXCLUDE_FOLDER_SET, SYNC_PREFIXES, EXCLUDE_PREFIXES
+    if fresh is None:
+        fresh = _load_user_config()
     SHARE_LINK = os.environ.get("AUTOSYNC_SHARE_LINK", fresh.get("share_link", ""))
     LOCAL_FOLDER = os.environ.get(
         "AUTOSYNC_LOCAL_FOLDER",
@@ -121,3 +257,8 @@ def reload_config():
     NOTIFICATIONS_ENABLED = fresh.get("notifications_enabled", True)
     WEBHOOK_ENABLED = fresh.get("webhook_enabled", False)
     WEBHOOK_URL = fresh.get("webhook_url", "")
+    IGNORE_RE = _compile_ignore(IGNORE_PATTERNS)
+    SYNC_FOLDER_SET = _folder_set(SYNC_FOLDERS)
+    EXCLUDE_FOLDER_SET = _folder_set(EXCLUDE_FOLDERS)
+    SYNC_PREFIXES = _folder_prefixes(SYNC_FOLDER_SET)
+    EXCLUDE_PREFIXES = _folder_prefixes(EXCLUDE_FOLDER_SET)
@@ -1,60 +1,143 @@
 import logging
 import os
+import queue
+import threading
+import time
 
 from watchdog.events import FileSystemEventHandler
 from watchdog.observers import Observer
 
 import config as cfg
-from sync_engine import handle_local_change, handle_local_delete
+from sync_engine import _should_ignore, handle_local_change, handle_local_delete, is_recently_synced
 
 logger = logging.getLogger(__name__)
 
+_CHANGE = "change"
+_DELETE = "delete"
+
 
 class SyncEventHandler(FileSystemEventHandler):
-    """Handles local filesystem events and triggers sync actions."""
+    """Handles local filesystem events and triggers sync actions.
+
+    Events are queued and coalesced per path by a worker thread: a path is
+    only synced once it has been quiet for cfg.DEBOUNCE_SECONDS, and only
+    its latest operation is applied, so editors that fire a burst of
+    events per save cause a single upload.
 
-    def __init__(self, api_base):
+    The worker exits once shutdown_event is set; pass a process-wide event
+    to stop it together with the rest of the program.
+    """
+
+    def __init__(self, api_base, shutdown_event=None):
         super().__init__()
         self.api_base = api_base
+        # Event paths normally start with the watched folder, so relative
+        # paths can be sliced off instead of computed with os.path.relpath
+        self._prefix = cfg.LOCAL_FOLDER.rstrip(os.sep) + os.sep
+        self._prefix_len = len(self._prefix)
+        self._sep_is_slash = os.sep == "/"
+        self._events = queue.Queue()
+        self._shutdown = shutdown_event if shutdown_event is not None else threading.Event()
+        self._worker = threading.Thread(target=self._run_worker, daemon=True)
+        self._worker.start()
 
-    def _get_rel_path(self, event):
+    def _rel_path(self, path):
         """Convert an absolute event path to a relative path from cfg.LOCAL_FOLDER."""
-        rel = os.path.relpath(event.src_path, cfg.LOCAL_FOLDER)
-        return rel.replace(os.sep, "/")
+        if path.startswith(self._prefix):
+            rel = path[self._prefix_len:]
+        else:
+            rel = os.path.relpath(path, cfg.LOCAL_FOLDER)
+        return rel if self._sep_is_slash else rel.replace(os.sep, "/")
+
+    def _get_rel_path(self, event):
+        return self._rel_path(event.src_path)
+
+    def _enqueue(self, op, rel_path):
+        if self._shutdown.is_set():
+            return
+        # Editor temp files are the bulk of events; drop them before queueing
+        if _should_ignore(rel_path):
+            return
+        # Drop echoes of files the sync engine itself just wrote
+        if is_recently_synced(rel_path):
+            logger.debug("Skipping watcher event (recently synced): %s", rel_path)
+            return
+        self._events.put((op, rel_path))
 
     def on_created(self, event):
         if event.is_directory:
             return
-        rel_path = self._get_rel_path(event)
-        handle_local_change(self.api_base, rel_path)
+        self._enqueue(_CHANGE, self._get_rel_path(event))
 
     def on_modified(self, event):
         if event.is_directory:
             return
-        rel_path = self._get_rel_path(event)
-        handle_local_change(self.api_base, rel_path)
+        self._enqueue(_CHANGE, self._get_rel_path(event))
 
     def on_deleted(self, event):
         if event.is_directory:
             return
-        rel_path = self._get_rel_path(event)
-        handle_local_delete(self.api_base, rel_path)
+        self._enqueue(_DELETE, self._get_rel_path(event))
 
     def on_moved(self, event):
         if event.is_directory:
             return
         # Treat move as delete old + create new
-        old_rel = os.path.relpath(event.src_path, cfg.LOCAL_FOLDER).replace(os.sep, "/")
-        new_rel = os.path.relpath(event.dest_path, cfg.LOCAL_FOLDER).replace(os.sep, "/")
-        handle_local_delete(self.api_base, old_rel)
-        handle_local_change(self.api_base, new_rel)
+        old_rel = self._rel_path(event.src_path)
+        new_rel = self._rel_path(event.dest_path)
+        self._enqueue(_DELETE, old_rel)
+        self._enqueue(_CHANGE, new_rel)
+
+    def stop(self):
+        """Stop the worker thread; pending events are left for the next full sync."""
+        self._shutdown.set()
+        self._events.put(None)
+        self._worker.join(timeout=5)
+
+    def _run_worker(self):
+        """Coalesce queued events per path and dispatch them once quiet."""
+        pending = {}  # rel_path -> (op, deadline)
+        while not self._shutdown.is_set():
+            timeout = None
+            if pending:
+                next_due = min(deadline for _, deadline in pending.values())
+                timeout = max(0.0, next_due - time.monotonic())
+            try:
+                item = self._events.get(timeout=timeout)
+                if item is not None:
+                    op, rel_path = item
+                    pending[rel_path] = (op, time.monotonic() + cfg.DEBOUNCE_SECONDS)
+            except queue.Empty:
+                pass
+            if self._shutdown.is_set():
+                break
+
+            now = time.monotonic()
+            due = [p for p, (_, deadline) in pending.items() if deadline <= now]
+            for rel_path in due:
+                op, _ = pending.pop(rel_path)
+                self._dispatch(op, rel_path)
+
+        if pending:
+            logger.debug("Watcher stopped with %d pending event(s)", len(pending))
+
+    def _dispatch(self, op, rel_path):
+        try:
+            if op == _DELETE:
+                handle_local_delete(self.api_base, rel_path)
+            else:
+                handle_local_change(self.api_base, rel_path)
+        except Exception as e:
+            logger.error("Watcher failed to sync %s: %s", rel_path, e)
 
 
-def start_watcher(api_base):
+def start_watcher(api_base, shutdown_event=None):
     """Start the watchdog observer watching cfg.LOCAL_FOLDER. Returns the observer thread."""
-    event_handler = SyncEventHandler(api_base)
+    event_handler = SyncEventHandler(api_base, shutdown_event)
     observer = Observer()
     observer.schedule(event_handler, cfg.LOCAL_FOLDER, recursive=True)
+    # Keep a handle on the handler so stop_watcher can stop its worker
+    observer.sync_event_handler = event_handler
     observer.start()
     logger.info("File watcher started on %s", cfg.LOCAL_FOLDER)
     return observer
@@ -62,6 +145,10 @@ def start_watcher(api_base):
 
 def stop_watcher(observer):
     """Gracefully stop the watchdog observer."""
+    # Stop the worker first so events raised while the observer winds down are dropped
+    handler = getattr(observer, "sync_event_handler", None)
+    if handler is not None:
+        handler.stop()
     observer.stop()
     observer.join()
     logger.info("File watcher stopped")
@@ -7,48 +7,74 @@ import time
 
 import config as cfg
 
+# Guards the API-call buckets and counters only; the timestamps below are
+# single assignments and need no lock
 _lock = threading.Lock()
-_start_time = time.time()
+_start_monotonic = time.monotonic()
 
-# Rolling window of API call results: list of (timestamp, status_code)
-_api_calls = []
+# Rolling window of API call results, bucketed per second so memory stays
+# fixed however many calls arrive: bucket i counts calls in seconds s with
+# s % _API_WINDOW == i, and _total/_errors are the sums over all buckets
 _API_WINDOW = 300  # 5 minutes
+_bucket_calls = [0] * _API_WINDOW
+_bucket_errors = [0] * _API_WINDOW
+_bucket_sec = None  # newest second recorded in the buckets
+_total = 0
+_errors = 0  # calls with status >= 400
 
 _last_successful_sync = None
 
+# Last disk_usage() result: (monotonic timestamp, folder, free_bytes)
+_disk_cache = (0.0, None, None)
+_DISK_CACHE_TTL = 5
+
 
 def record_api_call(status_code):
     """Record an API call result for health tracking."""
-    now = time.time()
+    global _total, _errors
+    sec = int(time.monotonic())
     with _lock:
-        _api_calls.append((now, status_code))
-        # Prune entries older than the window
-        cutoff = now - _API_WINDOW
-        while _api_calls and _api_calls[0][0] < cutoff:
-            _api_calls.pop(0)
+        _advance_locked(sec)
+        i = sec % _API_WINDOW
+        _bucket_calls[i] += 1
+        _total += 1
+        if status_code >= 400:
+            _bucket_errors[i] += 1
+            _errors += 1
+
+
+def _advance_locked(sec):
+    """Empty the buckets of seconds that left the window; caller holds _lock."""
+    global _bucket_sec, _total, _errors
+    if _bucket_sec is None or sec <= _bucket_sec:
+        if _bucket_sec is None:
+            _bucket_sec = sec
+        return
+    for s in range(_bucket_sec + 1, _bucket_sec + 1 + min(sec - _bucket_sec, _API_WINDOW)):
+        i = s % _API_WINDOW
+        _total -= _bucket_calls[i]
+        _errors -= _bucket_errors[i]
+        _bucket_calls[i] = _bucket_errors[i] = 0
+    _bucket_sec = sec
 
 
 def record_successful_sync():
     """Record that a sync completed successfully."""
     global _last_successful_sync
+    # Wall-clock time: reported to clients for display
     _last_successful_sync = time.time()
 
 
 def get_health(token_expires_in=None):
     """Return a health status dict."""
-    now = time.time()
+    now = time.monotonic()
     with _lock:
-        cutoff = now - _API_WINDOW
-        recent = [c for c in _api_calls if c[0] >= cutoff]
-        total = len(recent)
-        errors = sum(1 for _, code in recent if code >= 400)
+        _advance_locked(int(now))
+        total = _total
+        errors = _errors
         error_rate = (errors / total * 100) if total > 0 else 0.0
 
-    try:
-        disk = shutil.disk_usage(cfg.LOCAL_FOLDER if os.path.isdir(cfg.LOCAL_FOLDER) else "/")
-        disk_free = disk.free
-    except Exception:
-        disk_free = None
+    disk_free = _get_disk_free(now)
 
     return {
         "token_expires_in": token_expires_in,
@@ -56,5 +82,20 @@ def get_health(token_expires_in=None):
         "api_error_rate_5min": round(error_rate, 1),
         "last_successful_sync": _last_successful_sync,
         "disk_free_bytes": disk_free,
-        "uptime_seconds": int(now - _start_time),
+        "uptime_seconds": int(now - _start_monotonic),
     }
+
+
+def _get_disk_free(now):
+    """Return free bytes on the sync folder's disk, cached for _DISK_CACHE_TTL seconds."""
+    global _disk_cache
+    cached_at, folder, disk_free = _disk_cache
+    if folder == cfg.LOCAL_FOLDER and now - cached_at < _DISK_CACHE_TTL:
+        return disk_free
+    folder = cfg.LOCAL_FOLDER
+    try:
+        disk_free = shutil.disk_usage(folder if os.path.isdir(folder) else "/").free
+    except Exception:
+        disk_free = None
+    _disk_cache = (now, folder, disk_free)
+    return disk_free
@@ -1,7 +1,9 @@
 """macOS LaunchAgent install/uninstall for AutoSync auto-start."""
 
+import functools
 import logging
 import os
+import plistlib
 import subprocess
 import sys
 
@@ -22,39 +24,25 @@ def _program_arguments():
     return [sys.executable, os.path.join(_DIR, "app.py")]
 
 
+@functools.lru_cache(maxsize=None)
 def _build_plist():
-    """Generate the LaunchAgent plist XML."""
-    args = "\n".join(f"        <string>{arg}</string>" for arg in _program_arguments())
-    return f"""<?xml version="1.0" encoding="UTF-8"?>
-<!DOCTYPE plist PUBLIC "-//Apple//DTD PLIST 1.0//EN"
-  "http://www.apple.com/DTDs/PropertyList-1.0.dtd">
-<plist version="1.0">
-<dict>
-    <key>Label</key>
-    <string>{PLIST_LABEL}</string>
-    <key>ProgramArguments</key>
-    <array>
-{args}
-    </array>
-    <key>WorkingDirectory</key>
-    <string>{cfg.DATA_DIR}</string>
-    <key>RunAtLoad</key>
-    <true/>
-    <key>KeepAlive</key>
-    <false/>
-    <key>StandardOutPath</key>
-    <string>{os.path.join(cfg.DATA_DIR, "autosync_stdout.log")}</string>
-    <key>StandardErrorPath</key>
-    <string>{os.path.join(cfg.DATA_DIR, "autosync_stderr.log")}</string>
-</dict>
-</plist>"""
+    """Generate the LaunchAgent plist XML as bytes; inputs are fixed per process."""
+    return plistlib.dumps({
+        "Label": PLIST_LABEL,
+        "ProgramArguments": _program_arguments(),
+        "WorkingDirectory": cfg.DATA_DIR,
+        "RunAtLoad": True,
+        "KeepAlive": False,
+        "StandardOutPath": os.path.join(cfg.DATA_DIR, "autosync_stdout.log"),
+        "StandardErrorPath": os.path.join(cfg.DATA_DIR, "autosync_stderr.log"),
+    }, sort_keys=False)
 
 
 def install():
     """Write the LaunchAgent plist and load it."""
     os.makedirs(PLIST_DIR, exist_ok=True)
     plist_content = _build_plist()
-    with open(PLIST_PATH, "w", encoding="utf-8") as f:
+    with open(PLIST_PATH, "wb") as f:
         f.write(plist_content)
     try:
         subprocess.run(["launchctl", "load", PLIST_PATH], check=True,
@@ -5,59 +5,100 @@ import queue
 import threading
 from collections import deque
 
+_DATEFMT = "%Y-%m-%d %H:%M:%S"
+_TIMESTAMP_LEN = 19  # len("2024-01-31 23:59:59")
+
+
+class SubscriberQueue:
+    """Bounded per-subscriber buffer that drops the oldest entries when full.
+
+    A slow client therefore loses old lines rather than growing memory or
+    missing the newest ones.
+    """
+
+    def __init__(self, maxlen=1024):
+        self._items = deque(maxlen=maxlen)
+        self._cond = threading.Condition()
+
+    def put(self, entry):
+        with self._cond:
+            self._items.append(entry)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Pop the oldest entry, waiting up to timeout seconds; raises queue.Empty."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items, timeout):
+                raise queue.Empty
+            return self._items.popleft()
+
+    def get_batch(self, timeout=None, max_items=64):
+        """Wait up to timeout seconds, then pop up to max_items entries; raises queue.Empty."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items, timeout):
+                raise queue.Empty
+            items = self._items
+            return [items.popleft() for _ in range(min(len(items), max_items))]
+
 
 class SSELogHandler(logging.Handler):
     """Logging handler that captures log records for SSE streaming.
 
     Keeps a bounded history for backfill on new connections and
     pushes formatted entries to all subscriber queues.
+
+    Each subscriber is an open SSE response, which holds one server worker
+    thread for as long as the client stays connected, so the number of
+    concurrent subscribers is capped at max_subscribers.
     """
 
-    def __init__(self, maxlen=100):
+    def __init__(self, maxlen=100, max_subscribers=16):
         super().__init__()
         self._history = deque(maxlen=maxlen)
-        self._subscribers = []
+        # Replaced, never mutated, so emit can fan out from a snapshot
+        self._subscribers = ()
+        self.max_subscribers = max_subscribers
         self._lock = threading.Lock()
         self.setFormatter(logging.Formatter(
             "%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S",
+            datefmt=_DATEFMT,
         ))
 
     def emit(self, record):
+        formatted = self.format(record)
         entry = {
-            "timestamp": self.format(record).split(" [")[0],
+            # The line starts with asctime, which _DATEFMT fixes at 19 chars
+            "timestamp": formatted[:_TIMESTAMP_LEN],
             "level": record.levelname,
             "logger": record.name,
-            "message": record.getMessage(),
-            "formatted": self.format(record),
+            # Set by format() above
+            "message": record.message,
+            "formatted": formatted,
         }
-        with self._lock:
-            self._history.append(entry)
-            for q in self._subscribers:
-                try:
-                    q.put_nowait(entry)
-                except queue.Full:
-                    pass
+        # deque.append and reading the tuple reference are both atomic
+        self._history.append(entry)
+        for q in self._subscribers:
+            q.put(entry)
 
     def subscribe(self):
-        """Create a new subscriber queue, backfill with history, return it."""
-        q = queue.Queue(maxsize=200)
+        """Create a new subscriber queue, backfill with history, return it.
+
+        Returns None if max_subscribers streams are already open.
+        """
+        q = SubscriberQueue()
         with self._lock:
-            for entry in self._history:
-                try:
-                    q.put_nowait(entry)
-                except queue.Full:
-                    break
-            self._subscribers.append(q)
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            # list() copies the deque in one step, safe against concurrent appends
+            for entry in list(self._history):
+                q.put(entry)
+            self._subscribers += (q,)
         return q
 
     def unsubscribe(self, q):
         """Remove a subscriber queue."""
         with self._lock:
-            try:
-                self._subscribers.remove(q)
-            except ValueError:
-                pass
+            self._subscribers = tuple(s for s in self._subscribers if s is not q)
 
 
 # Singleton instance attached to root logger
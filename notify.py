@@ -11,36 +11,56 @@ logger = logging.getLogger(__name__)
 _SYSTEM = platform.system()
 
 
+# Constant AppleScript; title and message arrive as run-handler arguments,
+# so quotes in file names cannot break out of the string literal
+_OSASCRIPT_ARGS = [
+    "osascript",
+    "-e", "on run argv",
+    "-e", "display notification (item 1 of argv) with title (item 2 of argv)",
+    "-e", "end run",
+]
+
+
+def _send_darwin(title, message):
+    subprocess.Popen(
+        _OSASCRIPT_ARGS + [message, title],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def _send_windows(title, message):
+    ps_script = (
+        "[Windows.UI.Notifications.ToastNotificationManager, Windows.UI.Notifications, ContentType = WindowsRuntime] > $null; "
+        "$template = [Windows.UI.Notifications.ToastNotificationManager]::GetTemplateContent([Windows.UI.Notifications.ToastTemplateType]::ToastText02); "
+        "$textNodes = $template.GetElementsByTagName('text'); "
+        f"$textNodes.Item(0).AppendChild($template.CreateTextNode('{title}')) > $null; "
+        f"$textNodes.Item(1).AppendChild($template.CreateTextNode('{message}')) > $null; "
+        "$toast = [Windows.UI.Notifications.ToastNotification]::new($template); "
+        "[Windows.UI.Notifications.ToastNotificationManager]::CreateToastNotifier('AutoSync').Show($toast)"
+    )
+    subprocess.Popen(
+        ["powershell", "-WindowStyle", "Hidden", "-Command", ps_script],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+    )
+
+
+def _send_unsupported(title, message):
+    logger.debug("Notifications not supported on %s", _SYSTEM)
+
+
+# Platform backend, picked once at import
+_impl = {"Darwin": _send_darwin, "Windows": _send_windows}.get(_SYSTEM, _send_unsupported)
+
+
 def _send(title, message):
     """Send a desktop notification."""
     if not getattr(cfg, "NOTIFICATIONS_ENABLED", True):
         return
     try:
-        if _SYSTEM == "Darwin":
-            script = f'display notification "{message}" with title "{title}"'
-            subprocess.Popen(
-                ["osascript", "-e", script],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-            )
-        elif _SYSTEM == "Windows":
-            ps_script = (
-                "[Windows.UI.Notifications.ToastNotificationManager, Windows.UI.Notifications, ContentType = WindowsRuntime] > $null; "
-                "$template = [Windows.UI.Notifications.ToastNotificationManager]::GetTemplateContent([Windows.UI.Notifications.ToastTemplateType]::ToastText02); "
-                "$textNodes = $template.GetElementsByTagName('text'); "
-                f"$textNodes.Item(0).AppendChild($template.CreateTextNode('{title}')) > $null; "
-                f"$textNodes.Item(1).AppendChild($template.CreateTextNode('{message}')) > $null; "
-                "$toast = [Windows.UI.Notifications.ToastNotification]::new($template); "
-                "[Windows.UI.Notifications.ToastNotificationManager]::CreateToastNotifier('AutoSync').Show($toast)"
-            )
-            subprocess.Popen(
-                ["powershell", "-WindowStyle", "Hidden", "-Command", ps_script],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
-            )
-        else:
-            logger.debug("Notifications not supported on %s", _SYSTEM)
+        _impl(title, message)
     except Exception as e:
         logger.debug("Notification failed: %s", e)
 
@@ -1,11 +1,18 @@
 import base64
+import concurrent.futures
+import functools
 import logging
 import os
+import threading
 import time
+from urllib.parse import quote
 
 import requests
+import urllib3
+from requests.adapters import HTTPAdapter
 
 from config import (
+    DOWNLOAD_CHUNK_SIZE,
     GRAPH_API_BASE,
     MAX_RETRIES,
     RETRY_BACKOFF_BASE,
@@ -13,9 +20,56 @@ from config import (
     UPLOAD_CHUNK_SIZE,
 )
 
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import auth
+except ImportError:
+    auth = None
+
+try:
+    import health_monitor
+except ImportError:
+    health_monitor = None
+
 logger = logging.getLogger(__name__)
 
+# Errors raised while a streamed page body is still being read, after
+# _request_with_retry has already returned
+_PAGE_READ_ERRORS = (requests.RequestException, urllib3.exceptions.HTTPError)
+if ijson is not None:
+    _PAGE_READ_ERRORS += (ijson.JSONError,)
+
+# Shared session so Graph calls reuse pooled keep-alive connections instead of
+# a new TCP + TLS handshake per request. Retries are handled here, not by urllib3.
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=0))
+_pool_maxsize = 32
+_pool_lock = threading.Lock()
+
+
+def ensure_connection_pool(concurrency):
+    """Grow the session's per-host pool so `concurrency` requests each keep a connection.
+
+    Requests beyond pool_maxsize still go out but their connections are closed
+    afterwards, costing a fresh TCP + TLS handshake per request.
+    """
+    global _pool_maxsize
+    with _pool_lock:
+        if concurrency <= _pool_maxsize:
+            return
+        old = _session.get_adapter("https://")
+        _session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=concurrency,
+                                               max_retries=0))
+        _pool_maxsize = concurrency
+    # Release the idle sockets held by the replaced pool
+    old.close()
 
+
+@functools.lru_cache(maxsize=128)
 def encode_sharing_url(share_url):
     """Convert a OneDrive sharing URL to a Graph API sharing token."""
     encoded = base64.b64encode(share_url.encode("utf-8")).decode("utf-8")
@@ -23,6 +77,7 @@ def encode_sharing_url(share_url):
     return "u!" + encoded
 
 
+@functools.lru_cache(maxsize=128)
 def get_api_base(share_url):
     """Return the Graph API base path for a shared link."""
     token = encode_sharing_url(share_url)
@@ -31,6 +86,10 @@ def get_api_base(share_url):
 
 _drive_base_cache = {}
 
+# Folder listing: concurrent requests and items per children page
+_LIST_MAX_WORKERS = 8
+_LIST_PAGE_SIZE = 999
+
 
 def _resolve_drive_base(api_base):
     """Resolve a shares-based URL to a drives-based URL for path operations."""
@@ -76,53 +135,69 @@ def validate_share_link(api_base):
 def list_remote_files(api_base, path="/"):
     """Recursively list all files under the shared folder.
 
+    Sibling folders are listed concurrently, breadth-first.
+
     Returns a list of dicts: {name, size, lastModifiedDateTime, path, remote_hash}
     """
     files = []
-    _list_recursive(api_base, path, files)
+    # Resolve once up front so worker threads only read _drive_base_cache
+    _resolve_drive_base(api_base)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=_LIST_MAX_WORKERS) as pool:
+        pending = {pool.submit(_list_folder, api_base, path)}
+        while pending:
+            done, pending = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                folder_files, subfolders = future.result()
+                files.extend(folder_files)
+                for sub in subfolders:
+                    pending.add(pool.submit(_list_folder, api_base, sub))
     return files
 
 
-def _list_recursive(api_base, path, files):
-    """Walk through the remote folder tree."""
+def _list_folder(api_base, path):
+    """List one remote folder. Returns (files, subfolder_paths)."""
     if path == "/":
         drive_base = _resolve_drive_base(api_base)
         url = f"{drive_base}/children" if drive_base else f"{api_base}/driveItem/children"
     else:
         url = _item_url(api_base, path.lstrip("/"), "/children")
+    # Page size; nextLink URLs carry it forward
+    url += f"?$top={_LIST_PAGE_SIZE}"
+
+    files = []
+    subfolders = []
+    prefix = "" if path == "/" else path.lstrip("/") + "/"
+
+    def add_item(item):
+        item_path = prefix + item["name"]
+
+        if "folder" in item:
+            subfolders.append("/" + item_path)
+        elif "file" in item:
+            # Extract hash from Graph API response
+            hashes = item.get("file", {}).get("hashes", {})
+            remote_hash = (
+                hashes.get("sha256Hash")
+                or hashes.get("quickXorHash")
+                or ""
+            )
+            files.append({
+                "name": item["name"],
+                "size": item.get("size", 0),
+                "lastModifiedDateTime": item.get("lastModifiedDateTime", ""),
+                "path": item_path,
+                "remote_hash": remote_hash,
+            })
 
     while url:
-        resp = _request_with_retry("GET", url)
-        if resp.status_code != 200:
+        resp, links = _read_page(url, add_item, files, subfolders)
+        if links is None:
             logger.error("Failed to list %s: %s %s", path, resp.status_code, resp.text[:200])
-            return
+            break
 
-        data = resp.json()
-        for item in data.get("value", []):
-            if path == "/":
-                item_path = item["name"]
-            else:
-                item_path = path.lstrip("/") + "/" + item["name"]
-
-            if "folder" in item:
-                _list_recursive(api_base, "/" + item_path, files)
-            elif "file" in item:
-                # Extract hash from Graph API response
-                hashes = item.get("file", {}).get("hashes", {})
-                remote_hash = (
-                    hashes.get("sha256Hash")
-                    or hashes.get("quickXorHash")
-                    or ""
-                )
-                files.append({
-                    "name": item["name"],
-                    "size": item.get("size", 0),
-                    "lastModifiedDateTime": item.get("lastModifiedDateTime", ""),
-                    "path": item_path,
-                    "remote_hash": remote_hash,
-                })
-
-        url = data.get("@odata.nextLink")
+        url = links.get("@odata.nextLink")
+    return files, subfolders
 
 
 def list_remote_changes(api_base, delta_link=None):
@@ -143,57 +218,120 @@ def list_remote_changes(api_base, delta_link=None):
     changes = []
     new_delta_link = None
 
+    def add_item(item):
+        is_deleted = "deleted" in item
+        is_file = "file" in item
+        is_folder = "folder" in item
+
+        # Build path from parentReference
+        parent_ref = item.get("parentReference", {})
+        parent_path = parent_ref.get("path", "")
+        # parentReference.path looks like /drives/{id}/items/{id}:/folder/subfolder
+        # We need just the relative path after the ":"
+        if ":" in parent_path:
+            parent_rel = parent_path.split(":", 1)[1].lstrip("/")
+        else:
+            parent_rel = ""
+
+        item_name = item.get("name", "")
+        if parent_rel:
+            item_path = f"{parent_rel}/{item_name}"
+        else:
+            item_path = item_name
+
+        if is_deleted or is_file:
+            hashes = item.get("file", {}).get("hashes", {}) if is_file else {}
+            remote_hash = hashes.get("sha256Hash") or hashes.get("quickXorHash") or ""
+            changes.append({
+                "path": item_path,
+                "name": item_name,
+                "size": item.get("size", 0),
+                "lastModifiedDateTime": item.get("lastModifiedDateTime", ""),
+                "remote_hash": remote_hash,
+                "deleted": is_deleted,
+                "is_folder": is_folder,
+            })
+
     while url:
-        resp = _request_with_retry("GET", url)
-        if resp.status_code != 200:
+        resp, links = _read_page(url, add_item, changes)
+        if links is None:
             logger.error("Delta query failed: %s %s", resp.status_code, resp.text[:200])
             return [], None
 
-        data = resp.json()
-        for item in data.get("value", []):
-            is_deleted = "deleted" in item
-            is_file = "file" in item
-            is_folder = "folder" in item
-
-            # Build path from parentReference
-            parent_ref = item.get("parentReference", {})
-            parent_path = parent_ref.get("path", "")
-            # parentReference.path looks like /drives/{id}/items/{id}:/folder/subfolder
-            # We need just the relative path after the ":"
-            if ":" in parent_path:
-                parent_rel = parent_path.split(":", 1)[1].lstrip("/")
-            else:
-                parent_rel = ""
-
-            item_name = item.get("name", "")
-            if parent_rel:
-                item_path = f"{parent_rel}/{item_name}"
-            else:
-                item_path = item_name
-
-            if is_deleted or is_file:
-                hashes = item.get("file", {}).get("hashes", {}) if is_file else {}
-                remote_hash = hashes.get("sha256Hash") or hashes.get("quickXorHash") or ""
-                changes.append({
-                    "path": item_path,
-                    "name": item_name,
-                    "size": item.get("size", 0),
-                    "lastModifiedDateTime": item.get("lastModifiedDateTime", ""),
-                    "remote_hash": remote_hash,
-                    "deleted": is_deleted,
-                    "is_folder": is_folder,
-                })
-
         # Follow pagination or get the final delta link
-        url = data.get("@odata.nextLink")
+        url = links.get("@odata.nextLink")
         if not url:
-            new_delta_link = data.get("@odata.deltaLink")
+            new_delta_link = links.get("@odata.deltaLink")
 
     return changes, new_delta_link
 
 
-def download_file(api_base, remote_path, local_path, progress_cb=None):
-    """Download a single file from OneDrive to a local path."""
+_PAGE_LINK_KEYS = ("@odata.nextLink", "@odata.deltaLink")
+
+
+def _read_page(url, consume, *outputs):
+    """GET one Graph collection page and pass each of its items to consume.
+
+    Returns (resp, links); links is None if the page request failed. A body
+    that breaks off mid-read is requested again, after dropping whatever
+    consume appended to outputs from the partial read.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        resp = _request_with_retry("GET", url, stream=ijson is not None)
+        if resp.status_code != 200:
+            return resp, None
+
+        marks = [len(out) for out in outputs]
+        links = {}
+        try:
+            with resp:
+                for item in _iter_page_items(resp, links):
+                    consume(item)
+            return resp, links
+        except _PAGE_READ_ERRORS as e:
+            if attempt == MAX_RETRIES:
+                logger.error("Page read failed after %d retries: %s — %s", MAX_RETRIES, url, e)
+                raise
+            logger.warning("Page read interrupted (attempt %d/%d): %s", attempt + 1, MAX_RETRIES, e)
+            for out, mark in zip(outputs, marks):
+                del out[mark:]
+            time.sleep(RETRY_BACKOFF_BASE * (2 ** attempt))
+
+
+def _iter_page_items(resp, links):
+    """Yield the items of a Graph collection page, storing its paging links in links.
+
+    With ijson installed the (streamed) body is parsed incrementally, so only
+    one item is materialized at a time.
+    """
+    if ijson is None:
+        data = resp.json()
+        for key in _PAGE_LINK_KEYS:
+            if key in data:
+                links[key] = data[key]
+        yield from data.get("value", [])
+        return
+
+    resp.raw.decode_content = True
+    builder = None
+    for prefix, event, value in ijson.parse(resp.raw):
+        if builder is not None:
+            builder.event(event, value)
+            if prefix == "value.item" and event == "end_map":
+                yield builder.value
+                builder = None
+        elif prefix == "value.item" and event == "start_map":
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+        elif prefix in _PAGE_LINK_KEYS and event == "string":
+            links[prefix] = value
+
+
+def download_file(api_base, remote_path, local_path, progress_cb=None, hasher=None):
+    """Download a single file from OneDrive to a local path.
+
+    If hasher is given, every written chunk is fed to hasher.update().
+    """
     url = _item_url(api_base, remote_path, "/content")
 
     resp = _request_with_retry("GET", url, stream=True)
@@ -204,9 +342,18 @@ def download_file(api_base, remote_path, local_path, progress_cb=None):
     total = int(resp.headers.get("Content-Length", 0))
     os.makedirs(os.path.dirname(local_path), exist_ok=True)
     bytes_done = 0
+    # Read the raw stream in large blocks; iter_content's 8 KiB generator
+    # dominated CPU time on big files
+    raw = resp.raw
+    raw.decode_content = True
     with open(local_path, "wb") as f:
-        for chunk in resp.iter_content(chunk_size=8192):
+        while True:
+            chunk = raw.read(DOWNLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
             f.write(chunk)
+            if hasher is not None:
+                hasher.update(chunk)
             bytes_done += len(chunk)
             if progress_cb and total:
                 progress_cb(bytes_done, total)
@@ -215,25 +362,50 @@ def download_file(api_base, remote_path, local_path, progress_cb=None):
     return True
 
 
-def upload_file(api_base, remote_path, local_path, progress_cb=None):
+def upload_file(api_base, remote_path, local_path, progress_cb=None, hasher=None):
     """Upload a local file to OneDrive.
 
+    If hasher is given, the uploaded bytes are fed to hasher.update().
     Returns the remote item metadata dict on success, or None on failure.
     """
     file_size = os.path.getsize(local_path)
 
     if file_size <= SIMPLE_UPLOAD_MAX:
-        return _simple_upload(api_base, remote_path, local_path, progress_cb)
+        return _simple_upload(api_base, remote_path, local_path, progress_cb, hasher)
     else:
-        return _chunked_upload(api_base, remote_path, local_path, file_size, progress_cb)
+        return _chunked_upload(api_base, remote_path, local_path, file_size, progress_cb, hasher)
+
+
+def _open_for_read(local_path):
+    """Open a file for one sequential read without updating its access time.
+
+    O_NOATIME is Linux-only and refused with EPERM on files we don't own, in
+    which case the file is opened normally.
+    """
+    flags = os.O_RDONLY | getattr(os, "O_BINARY", 0)
+    noatime = getattr(os, "O_NOATIME", 0)
+    try:
+        fd = os.open(local_path, flags | noatime)
+    except PermissionError:
+        if not noatime:
+            raise
+        fd = os.open(local_path, flags)
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+    return os.fdopen(fd, "rb")
 
 
-def _simple_upload(api_base, remote_path, local_path, progress_cb=None):
+def _simple_upload(api_base, remote_path, local_path, progress_cb=None, hasher=None):
     """Upload a small file (<4MB) using PUT to /content."""
     url = _item_url(api_base, remote_path, "/content")
 
-    with open(local_path, "rb") as f:
+    with _open_for_read(local_path) as f:
         data = f.read()
+    if hasher is not None:
+        hasher.update(data)
 
     if progress_cb:
         progress_cb(0, len(data))
@@ -250,7 +422,7 @@ def _simple_upload(api_base, remote_path, local_path, progress_cb=None):
     return None
 
 
-def _chunked_upload(api_base, remote_path, local_path, file_size, progress_cb=None):
+def _chunked_upload(api_base, remote_path, local_path, file_size, progress_cb=None, hasher=None):
     """Upload a large file using an upload session with chunked transfers."""
     url = _item_url(api_base, remote_path, "/createUploadSession")
 
@@ -264,11 +436,19 @@ def _chunked_upload(api_base, remote_path, local_path, file_size, progress_cb=No
 
     upload_url = resp.json()["uploadUrl"]
 
-    with open(local_path, "rb") as f:
+    # Upload sessions only accept fragments in order, so instead of parallel
+    # PUTs the next chunk is read from disk while the current one uploads
+    with _open_for_read(local_path) as f, \
+            concurrent.futures.ThreadPoolExecutor(max_workers=1) as reader:
         offset = 0
+        next_chunk = reader.submit(f.read, UPLOAD_CHUNK_SIZE)
         while offset < file_size:
             chunk_end = min(offset + UPLOAD_CHUNK_SIZE, file_size) - 1
-            chunk_data = f.read(UPLOAD_CHUNK_SIZE)
+            chunk_data = next_chunk.result()
+            if chunk_end + 1 < file_size:
+                next_chunk = reader.submit(f.read, UPLOAD_CHUNK_SIZE)
+            if hasher is not None:
+                hasher.update(chunk_data)
             content_range = f"bytes {offset}-{chunk_end}/{file_size}"
 
             chunk_resp = _request_with_retry(
@@ -316,7 +496,13 @@ def delete_remote(api_base, remote_path):
 
 def _encode_path(path):
     """URL-encode path segments for Graph API, preserving slashes."""
-    return "/".join(requests.utils.quote(seg, safe="") for seg in path.split("/"))
+    return "/".join(map(_quote_seg, path.split("/")))
+
+
+@functools.lru_cache(maxsize=1024)
+def _quote_seg(seg):
+    """Percent-encode one path segment; folder names repeat across a tree scan."""
+    return quote(seg, safe="")
 
 
 def _request_with_retry(method, url, **kwargs):
@@ -325,47 +511,37 @@ def _request_with_retry(method, url, **kwargs):
     Includes 401 token refresh retry and health monitoring.
     """
     # Inject OAuth token if available
-    try:
-        import auth
-        token = auth.get_access_token()
+    if auth is not None:
+        try:
+            token = auth.get_access_token()
+        except Exception:
+            token = None
         if token:
             headers = kwargs.get("headers") or {}
             headers.setdefault("Authorization", f"Bearer {token}")
             kwargs["headers"] = headers
-    except Exception:
-        pass
 
-    _did_401_retry = False
+    refreshed = False
 
     for attempt in range(MAX_RETRIES + 1):
         try:
-            resp = requests.request(method, url, timeout=60, **kwargs)
-
-            # Record for health monitoring
-            try:
-                import health_monitor
-                health_monitor.record_api_call(resp.status_code)
-            except Exception:
-                pass
-
-            # Handle 401 — try force-refreshing the token once
-            if resp.status_code == 401 and not _did_401_retry:
-                _did_401_retry = True
-                try:
-                    import auth
-                    new_token = auth.get_access_token(force_refresh=True)
-                    if new_token:
-                        headers = kwargs.get("headers") or {}
-                        headers["Authorization"] = f"Bearer {new_token}"
-                        kwargs["headers"] = headers
-                        logger.info("Token refreshed on 401, retrying...")
-                        continue
-                except Exception:
-                    pass
+            resp = _send(method, url, kwargs)
+
+            # On the first 401, force-refresh the token and reissue right away;
+            # this does not use up one of the backoff attempts
+            if resp.status_code == 401 and not refreshed:
+                refreshed = True
+                if _refresh_token(kwargs):
+                    resp.close()
+                    resp = _send(method, url, kwargs)
 
             # Don't retry client errors (except 429 Too Many Requests)
             if resp.status_code < 500 and resp.status_code not in (429,):
                 return resp
+            # Hand the connection back to the shared pool before backing off;
+            # the last response is returned to the caller unread
+            if attempt < MAX_RETRIES:
+                resp.close()
             if resp.status_code == 429:
                 retry_after = int(resp.headers.get("Retry-After", RETRY_BACKOFF_BASE * (2 ** attempt)))
                 logger.warning("Rate limited, retrying in %ds...", retry_after)
@@ -373,11 +549,8 @@ def _request_with_retry(method, url, **kwargs):
                 continue
         except requests.RequestException as e:
             # Record connection errors as 0
-            try:
-                import health_monitor
+            if health_monitor is not None:
                 health_monitor.record_api_call(0)
-            except Exception:
-                pass
 
             if attempt == MAX_RETRIES:
                 logger.error("Request failed after %d retries: %s %s — %s", MAX_RETRIES, method, url, e)
@@ -390,3 +563,28 @@ def _request_with_retry(method, url, **kwargs):
             time.sleep(sleep_time)
 
     return resp
+
+
+def _send(method, url, kwargs):
+    """Issue one request on the shared session and record it for health monitoring."""
+    resp = _session.request(method, url, timeout=60, **kwargs)
+    if health_monitor is not None:
+        health_monitor.record_api_call(resp.status_code)
+    return resp
+
+
+def _refresh_token(kwargs):
+    """Force-refresh the OAuth token into kwargs' headers. Returns True on success."""
+    if auth is None:
+        return False
+    try:
+        new_token = auth.get_access_token(force_refresh=True)
+    except Exception:
+        return False
+    if not new_token:
+        return False
+    headers = kwargs.get("headers") or {}
+    headers["Authorization"] = f"Bearer {new_token}"
+    kwargs["headers"] = headers
+    logger.info("Token refreshed on 401, retrying...")
+    return True
@@ -3,18 +3,37 @@ import os
 import logging
 import shutil
 import tempfile
+import threading
 from datetime import datetime, timezone
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Single-file changes are appended to "<state path>.log" and folded into the
+# snapshot by the next save_state, or once the log grows past this size
+STATE_LOG_SUFFIX = ".log"
+_LOG_COMPACT_BYTES = 1024 * 1024
+_log_lock = threading.Lock()
+
 
 def load_state(path):
+    """Load sync state: the JSON snapshot plus any logged file changes."""
+    state = _load_snapshot(path)
+    _replay_log(state, path + STATE_LOG_SUFFIX)
+    return state
+
+
+def _load_snapshot(path):
     """Load sync state from JSON file. Returns empty state if file doesn't exist or is corrupt."""
     if not os.path.exists(path):
         return _empty_state()
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            state = json.load(f)
+        with open(path, "rb") as f:
+            state = _loads(f.read())
         if "files" not in state:
             state["files"] = {}
         if "last_poll" not in state:
@@ -37,8 +56,10 @@ def save_state(state, path):
     dir_name = os.path.dirname(path) or "."
     fd, tmp_path = tempfile.mkstemp(dir=dir_name, suffix=".tmp")
     try:
-        with os.fdopen(fd, "w", encoding="utf-8") as f:
-            json.dump(state, f, indent=2, default=str)
+        # Keys starting with "_" are in-memory indexes, not persisted state
+        persisted = {k: v for k, v in state.items() if not k.startswith("_")}
+        with os.fdopen(fd, "wb") as f:
+            f.write(_dumps(persisted))
         os.replace(tmp_path, path)
     except Exception:
         # Clean up temp file on failure
@@ -47,6 +68,84 @@ def save_state(state, path):
         except OSError:
             pass
         raise
+    # The snapshot now includes everything the log held
+    try:
+        os.remove(path + STATE_LOG_SUFFIX)
+    except FileNotFoundError:
+        pass
+
+
+def state_signature(path):
+    """Return a cheap (mtime, size) fingerprint of the snapshot and its log."""
+    sig = []
+    for p in (path, path + STATE_LOG_SUFFIX):
+        try:
+            st = os.stat(p)
+            sig.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            sig.append(None)
+    return tuple(sig)
+
+
+def record_file_entry(path, rel_path, size, local_mtime, remote_mtime,
+                      local_hash=None, remote_hash=None):
+    """Persist one file entry by appending it to the state log.
+
+    Equivalent to load_state + set_file_entry + save_state, without
+    rewriting the whole state file.
+    """
+    entry = _make_file_entry(size, local_mtime, remote_mtime, local_hash, remote_hash)
+    _append_log(path, {"op": "set", "path": rel_path, "entry": entry})
+
+
+def record_file_removal(path, rel_path):
+    """Persist the removal of one file entry by appending it to the state log."""
+    _append_log(path, {"op": "remove", "path": rel_path})
+
+
+def _append_log(path, record):
+    log_path = path + STATE_LOG_SUFFIX
+    with _log_lock:
+        with open(log_path, "ab") as f:
+            f.write(_dumps(record) + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+            log_size = f.tell()
+        if log_size > _LOG_COMPACT_BYTES:
+            save_state(load_state(path), path)
+
+
+def _replay_log(state, log_path):
+    """Apply logged file changes to state in order."""
+    try:
+        f = open(log_path, "rb")
+    except FileNotFoundError:
+        return
+    files = state["files"]
+    with f:
+        for line in f:
+            try:
+                record = _loads(line)
+            except ValueError:
+                # Torn write from an interrupted append
+                continue
+            if record.get("op") == "set":
+                files[record["path"]] = record["entry"]
+            elif record.get("op") == "remove":
+                files.pop(record["path"], None)
+
+
+def _loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps(state):
+    """Serialize state compactly to UTF-8 bytes."""
+    if orjson is not None:
+        return orjson.dumps(state, default=str)
+    return json.dumps(state, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
 
 
 def get_file_entry(state, rel_path):
@@ -57,6 +156,11 @@ def get_file_entry(state, rel_path):
 def set_file_entry(state, rel_path, size, local_mtime, remote_mtime,
                    local_hash=None, remote_hash=None):
     """Create or update a file entry in state."""
+    state["files"][rel_path] = _make_file_entry(size, local_mtime, remote_mtime,
+                                                local_hash, remote_hash)
+
+
+def _make_file_entry(size, local_mtime, remote_mtime, local_hash=None, remote_hash=None):
     entry = {
         "size": size,
         "local_mtime": local_mtime,
@@ -67,7 +171,7 @@ def set_file_entry(state, rel_path, size, local_mtime, remote_mtime,
         entry["local_hash"] = local_hash
     if remote_hash is not None:
         entry["remote_hash"] = remote_hash
-    state["files"][rel_path] = entry
+    return entry
 
 
 def remove_file_entry(state, rel_path):
@@ -77,30 +181,49 @@ def remove_file_entry(state, rel_path):
 
 def add_retry(state, path, action, error=""):
     """Add a failed operation to the retry queue."""
-    queue = state.setdefault("retry_queue", [])
+    queue, index = _retry_index(state)
+    key = (path, action)
     # Update existing entry or add new
-    for item in queue:
-        if item["path"] == path and item["action"] == action:
-            item["attempts"] = item.get("attempts", 0) + 1
-            item["error"] = error
-            item["next_retry"] = _next_retry_time(item["attempts"])
-            return
-    queue.append({
+    item = index.get(key)
+    if item is not None:
+        item["attempts"] = item.get("attempts", 0) + 1
+        item["error"] = error
+        item["next_retry"] = _next_retry_time(item["attempts"])
+        return
+    item = {
         "path": path,
         "action": action,
         "attempts": 1,
         "next_retry": _next_retry_time(1),
         "error": error,
-    })
+    }
+    queue.append(item)
+    index[key] = item
 
 
 def remove_retry(state, path, action):
     """Remove an item from the retry queue on success."""
-    queue = state.get("retry_queue", [])
-    state["retry_queue"] = [
-        item for item in queue
-        if not (item["path"] == path and item["action"] == action)
-    ]
+    queue, index = _retry_index(state)
+    item = index.pop((path, action), None)
+    if item is not None:
+        queue.remove(item)
+
+
+def _retry_index(state):
+    """Return (retry_queue, {(path, action): item}), rebuilding the index if stale.
+
+    The index lives under a "_" key, which save_state does not persist, and is
+    rebuilt whenever the queue list has been replaced or resized elsewhere.
+    """
+    queue = state.setdefault("retry_queue", [])
+    cached = state.get("_retry_index")
+    if cached is not None and cached[0] is queue and len(cached[1]) == len(queue):
+        return cached
+    index = {}
+    for item in queue:
+        index.setdefault((item["path"], item["action"]), item)
+    state["_retry_index"] = (queue, index)
+    return queue, index
 
 
 def _next_retry_time(attempts):
@@ -1,7 +1,10 @@
 import concurrent.futures
-import fnmatch
+import functools
 import hashlib
+import heapq
 import logging
+import math
+import mmap
 import os
 import threading
 import time
@@ -15,10 +18,14 @@ from onedrive_api import (
     download_file,
     upload_file,
     delete_remote,
+    ensure_connection_pool,
+    _open_for_read,
 )
 from state_db import (
     load_state,
     save_state,
+    record_file_entry,
+    record_file_removal,
     get_file_entry,
     set_file_entry,
     remove_file_entry,
@@ -26,10 +33,23 @@ from state_db import (
     remove_retry,
 )
 
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
+try:
+    import sync_history
+except ImportError:
+    sync_history = None
+
 logger = logging.getLogger(__name__)
 
 # Tracks recently synced files to prevent watcher feedback loops
 recently_synced = {}
+# (marked_at, rel_path) in time order, so purging only visits expired
+# entries; re-marked paths leave stale items that are skipped on pop
+_recently_synced_heap = []
 _recently_synced_lock = threading.Lock()
 
 # Lock for thread-safe state mutations during parallel transfers
@@ -68,79 +88,175 @@ def get_current_op():
 
 def mark_recently_synced(rel_path):
     """Record that a file was just synced (downloaded), so the watcher should ignore it."""
+    now = time.monotonic()
     with _recently_synced_lock:
-        recently_synced[rel_path] = time.time()
+        recently_synced[rel_path] = now
+        heapq.heappush(_recently_synced_heap, (now, rel_path))
+        # Purging only touches expired entries, so run it on every mark
+        _purge_recently_synced(now)
 
 
 def is_recently_synced(rel_path):
     """Check if a file was synced within the debounce window."""
-    with _recently_synced_lock:
-        ts = recently_synced.get(rel_path)
-        if ts is None:
-            return False
-        if time.time() - ts < cfg.DEBOUNCE_SECONDS:
-            return True
-        return False
+    # A single dict lookup is atomic, so the hot watcher path skips the lock
+    ts = recently_synced.get(rel_path)
+    return ts is not None and time.monotonic() - ts < cfg.DEBOUNCE_SECONDS
+
+
+def _purge_recently_synced(now):
+    """Drop entries older than DEBOUNCE_EXPIRY_SECONDS; caller holds the lock."""
+    heap = _recently_synced_heap
+    while heap and now - heap[0][0] > cfg.DEBOUNCE_EXPIRY_SECONDS:
+        marked_at, rel_path = heapq.heappop(heap)
+        if recently_synced.get(rel_path) == marked_at:
+            del recently_synced[rel_path]
 
 
 def cleanup_recently_synced():
     """Remove expired entries from recently_synced."""
     with _recently_synced_lock:
-        now = time.time()
-        expired = [k for k, v in recently_synced.items() if now - v > cfg.DEBOUNCE_EXPIRY_SECONDS]
-        for k in expired:
-            del recently_synced[k]
+        _purge_recently_synced(time.monotonic())
 
 
-def _compute_local_hash(file_path):
-    """Compute SHA-256 hash of a local file."""
-    h = hashlib.sha256()
+def _mtime_iso(ts):
+    """Format a POSIX timestamp exactly as datetime.fromtimestamp(ts, utc).isoformat().
+
+    Stored local_mtime values are compared as strings, so the output must
+    match byte for byte; this just skips building a datetime per file.
+    """
+    frac, whole = math.modf(ts)
+    us = round(frac * 1e6)
+    if us >= 1000000:
+        whole += 1
+        us -= 1000000
+    elif us < 0:
+        whole -= 1
+        us += 1000000
+    day, secs = divmod(int(whole), 86400)
+    minutes, sec = divmod(secs, 60)
+    hour, minute = divmod(minutes, 60)
+    if us:
+        return "%s%02d:%02d:%02d.%06d+00:00" % (_iso_date(day), hour, minute, sec, us)
+    return "%s%02d:%02d:%02d+00:00" % (_iso_date(day), hour, minute, sec)
+
+
+@functools.lru_cache(maxsize=4096)
+def _iso_date(day):
+    """'YYYY-MM-DDT' for a day number since the epoch."""
+    return time.strftime("%Y-%m-%dT", time.gmtime(day * 86400))
+
+
+# Local content hashes are "blake3:<hex>" when the blake3 package is
+# installed, else bare SHA-256 hex (the original format). They are only ever
+# compared with each other, never with OneDrive's remote hashes.
+_BLAKE3_PREFIX = "blake3:"
+_MMAP_HASH_MIN = 1024 * 1024
+# Per-thread read buffer for files below _MMAP_HASH_MIN, reused across calls
+_hash_buffers = threading.local()
+
+
+def _hash_buffer():
+    mv = getattr(_hash_buffers, "mv", None)
+    if mv is None:
+        mv = _hash_buffers.mv = memoryview(bytearray(_MMAP_HASH_MIN))
+    return mv
+
+
+def _compute_local_hash(file_path, use_blake3=None):
+    """Hash a local file in the current local_hash format (or the one requested)."""
+    if use_blake3 is None:
+        use_blake3 = blake3 is not None
     try:
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(65536), b""):
-                h.update(chunk)
-        return h.hexdigest()
-    except OSError:
+        if use_blake3:
+            h = blake3.blake3(max_threads=blake3.blake3.AUTO)
+            if os.path.getsize(file_path) >= _MMAP_HASH_MIN:
+                h.update_mmap(file_path)
+                return _BLAKE3_PREFIX + h.hexdigest()
+        else:
+            h = hashlib.sha256(usedforsecurity=False)
+        with _open_for_read(file_path) as f:
+            if not use_blake3 and os.fstat(f.fileno()).st_size >= _MMAP_HASH_MIN:
+                # One update over the whole mapping instead of a read loop;
+                # hashlib drops the GIL for the full buffer
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    h.update(mm)
+            else:
+                buf = _hash_buffer()
+                while True:
+                    n = f.readinto(buf)
+                    if not n:
+                        break
+                    h.update(buf[:n])
+        return (_BLAKE3_PREFIX if use_blake3 else "") + h.hexdigest()
+    except (OSError, ValueError):
         return None
 
 
+def _new_local_hasher():
+    """Return a hasher for feeding transfer chunks; see _hasher_digest."""
+    if blake3 is not None:
+        return blake3.blake3()
+    return hashlib.sha256(usedforsecurity=False)
+
+
+def _hasher_digest(h):
+    """Format a _new_local_hasher() digest like _compute_local_hash does."""
+    return (_BLAKE3_PREFIX if h.name == "blake3" else "") + h.hexdigest()
+
+
+def _local_hash_matches(file_path, stored_hash):
+    """Compare a file against its stored local_hash.
+
+    Returns (matches, hash_in_current_format). A hash stored in the other
+    format is checked in that format and upgraded on a match.
+    """
+    local_hash = _compute_local_hash(file_path)
+    if not local_hash or not stored_hash:
+        return False, local_hash
+    if local_hash == stored_hash:
+        return True, local_hash
+    stored_blake3 = stored_hash.startswith(_BLAKE3_PREFIX)
+    if stored_blake3 == local_hash.startswith(_BLAKE3_PREFIX) or (stored_blake3 and blake3 is None):
+        return False, local_hash
+    return _compute_local_hash(file_path, use_blake3=stored_blake3) == stored_hash, local_hash
+
+
 def _should_ignore(rel_path):
-    """Check if a file path should be ignored by sync using fnmatch patterns."""
-    basename = os.path.basename(rel_path)
-    # Always ignore state files
-    if basename == "sync_state.json" or basename.startswith(".sync_state"):
-        return True
-    for pattern in cfg.IGNORE_PATTERNS:
-        if fnmatch.fnmatch(basename, pattern):
-            return True
-    return False
+    """Check if a file path should be ignored by sync using the precompiled fnmatch patterns.
+
+    cfg.IGNORE_RE also covers the sync state files, so this is a single match.
+    """
+    return _should_ignore_cached(rel_path, cfg.IGNORE_RE)
 
 
 def _is_in_sync_scope(rel_path):
     """Check if path is within selective sync scope (include/exclude folders)."""
+    return _is_in_sync_scope_cached(rel_path, cfg.SYNC_FOLDER_SET, cfg.EXCLUDE_FOLDER_SET)
+
+
+# The config objects are part of the cache key: reload_config replaces them,
+# so stale results simply stop being hit and no explicit cache_clear is needed.
+@functools.lru_cache(maxsize=65536)
+def _should_ignore_cached(rel_path, ignore_re):
+    return ignore_re.match(rel_path.rpartition("/")[2]) is not None
+
+
+@functools.lru_cache(maxsize=65536)
+def _is_in_sync_scope_cached(rel_path, sync_folders, exclude_folders):
     # Check exclude folders first
-    for excl in cfg.EXCLUDE_FOLDERS:
-        excl = excl.strip().strip("/")
-        if not excl:
-            continue
-        if rel_path == excl or rel_path.startswith(excl + "/"):
-            return False
+    if rel_path in exclude_folders or rel_path.startswith(cfg.EXCLUDE_PREFIXES):
+        return False
     # Check include folders (empty = include all)
-    if not cfg.SYNC_FOLDERS:
+    if not sync_folders:
         return True
-    for incl in cfg.SYNC_FOLDERS:
-        incl = incl.strip().strip("/")
-        if not incl:
-            continue
-        if rel_path == incl or rel_path.startswith(incl + "/"):
-            return True
-    return False
+    return rel_path in sync_folders or rel_path.startswith(cfg.SYNC_PREFIXES)
 
 
 def _log_history(action, path, status, size=None, duration_ms=None, error=None):
     """Log a sync event to history."""
+    if sync_history is None:
+        return
     try:
-        import sync_history
         sync_history.log_event(action, path, status, size, duration_ms, error)
     except Exception:
         pass
@@ -165,36 +281,16 @@ def full_sync(api_base, progress_callback=None):
     except Exception as e:
         logger.error("Failed to list remote files: %s", e)
         return (0, 1)
-    remote_files = {f["path"]: f for f in remote_files_list}
+    # Scope is applied as each source is built, so the union needs no filter
+    # pass (the local scan already filters)
+    remote_files = {f["path"]: f for f in remote_files_list if _is_in_sync_scope(f["path"])}
 
     # 2. List local files
-    local_files = {}
-    for root, _dirs, filenames in os.walk(cfg.LOCAL_FOLDER):
-        for fname in filenames:
-            full_path = os.path.join(root, fname)
-            rel_path = os.path.relpath(full_path, cfg.LOCAL_FOLDER)
-            rel_path = rel_path.replace(os.sep, "/")
-            if _should_ignore(rel_path):
-                continue
-            if not _is_in_sync_scope(rel_path):
-                continue
-            try:
-                stat = os.stat(full_path)
-                local_files[rel_path] = {
-                    "size": stat.st_size,
-                    "mtime": datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc).isoformat(),
-                }
-            except OSError as e:
-                logger.warning("Cannot stat %s: %s", full_path, e)
+    local_files = _scan_local_files(cfg.LOCAL_FOLDER)
 
     # 3. Determine the union of all known paths
-    all_paths = set()
-    all_paths.update(remote_files.keys())
-    all_paths.update(local_files.keys())
-    all_paths.update(state["files"].keys())
-
-    # Filter by sync scope
-    all_paths = {p for p in all_paths if _is_in_sync_scope(p)}
+    all_paths = remote_files.keys() | local_files.keys()
+    all_paths.update(p for p in state["files"] if _is_in_sync_scope(p))
 
     # Build list of actions for parallel execution
     actions = []
@@ -214,15 +310,18 @@ def full_sync(api_base, progress_callback=None):
         elif in_local and not in_state:
             actions.append(("upload_new", rel_path, None, local_files[rel_path]))
 
+    hash_checks = _precompute_hash_checks(state, actions)
+
     synced_count = 0
     error_count = 0
 
     def _exec_action(action_tuple):
         action_type, rel_path, remote_info, local_info = action_tuple
-        t0 = time.time()
+        t0 = time.monotonic()
         try:
             if action_type == "sync_existing":
-                _sync_existing(api_base, state, rel_path, remote_info, local_info)
+                _sync_existing(api_base, state, rel_path, remote_info, local_info,
+                               hash_checks.get(rel_path))
             elif action_type == "local_deleted":
                 _handle_local_deleted_during_poll(api_base, state, rel_path)
             elif action_type == "remote_deleted":
@@ -231,11 +330,11 @@ def full_sync(api_base, progress_callback=None):
                 _download_new(api_base, state, rel_path, remote_info)
             elif action_type == "upload_new":
                 _upload_new(api_base, state, rel_path, local_info)
-            duration = int((time.time() - t0) * 1000)
+            duration = int((time.monotonic() - t0) * 1000)
             _log_history(action_type, rel_path, "ok", duration_ms=duration)
             return True
         except Exception as e:
-            duration = int((time.time() - t0) * 1000)
+            duration = int((time.monotonic() - t0) * 1000)
             logger.error("Error syncing %s: %s", rel_path, e)
             _log_history(action_type, rel_path, "error", duration_ms=duration, error=str(e))
             # Add to retry queue
@@ -245,6 +344,7 @@ def full_sync(api_base, progress_callback=None):
 
     # Execute actions in parallel
     max_workers = max(1, cfg.MAX_WORKERS)
+    ensure_connection_pool(max_workers)
     if len(actions) <= 1:
         # No point in threading for 0 or 1 action
         for action_tuple in actions:
@@ -261,7 +361,7 @@ def full_sync(api_base, progress_callback=None):
                 else:
                     error_count += 1
 
-    state["last_poll"] = datetime.now(timezone.utc).isoformat()
+    state["last_poll"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
     save_state(state, cfg.STATE_DB_PATH)
     _clear_progress()
     logger.info("Full sync complete: %d processed, %d errors", synced_count, error_count)
@@ -306,7 +406,7 @@ def delta_sync(api_base):
         if not _is_in_sync_scope(rel_path):
             continue
 
-        t0 = time.time()
+        t0 = time.monotonic()
         try:
             if change["deleted"]:
                 # Remote deleted
@@ -317,7 +417,7 @@ def delta_sync(api_base):
                 with _state_lock:
                     remove_file_entry(state, rel_path)
                 _log_history("delete", rel_path, "ok",
-                             duration_ms=int((time.time() - t0) * 1000))
+                             duration_ms=int((time.monotonic() - t0) * 1000))
             else:
                 # Remote created/modified → download
                 local_path = os.path.join(cfg.LOCAL_FOLDER, rel_path)
@@ -328,14 +428,12 @@ def delta_sync(api_base):
                     entry = state["files"][rel_path]
                     if os.path.exists(local_path):
                         stat = os.stat(local_path)
-                        local_mtime = datetime.fromtimestamp(
-                            stat.st_mtime, tz=timezone.utc
-                        ).isoformat()
+                        local_mtime = _mtime_iso(stat.st_mtime)
                         if local_mtime != entry.get("local_mtime", ""):
                             # Both changed — conflict
                             _handle_conflict_delta(api_base, state, rel_path, change)
                             _log_history("conflict", rel_path, "ok",
-                                         duration_ms=int((time.time() - t0) * 1000))
+                                         duration_ms=int((time.monotonic() - t0) * 1000))
                             synced_count += 1
                             continue
 
@@ -345,27 +443,25 @@ def delta_sync(api_base):
                 if download_file(api_base, rel_path, local_path,
                                  progress_cb=lambda done, total: _set_progress(rel_path, "download", done, total)):
                     stat = os.stat(local_path)
-                    new_local_mtime = datetime.fromtimestamp(
-                        stat.st_mtime, tz=timezone.utc
-                    ).isoformat()
+                    new_local_mtime = _mtime_iso(stat.st_mtime)
                     with _state_lock:
                         set_file_entry(state, rel_path, change["size"],
                                        new_local_mtime, change["lastModifiedDateTime"],
                                        remote_hash=change.get("remote_hash"))
                     _log_history("download", rel_path, "ok",
                                  size=change["size"],
-                                 duration_ms=int((time.time() - t0) * 1000))
+                                 duration_ms=int((time.monotonic() - t0) * 1000))
                 _clear_progress()
 
             synced_count += 1
         except Exception as e:
             logger.error("Delta sync error for %s: %s", rel_path, e)
             _log_history("delta_error", rel_path, "error",
-                         duration_ms=int((time.time() - t0) * 1000), error=str(e))
+                         duration_ms=int((time.monotonic() - t0) * 1000), error=str(e))
             error_count += 1
 
     state["delta_link"] = new_delta_link
-    state["last_poll"] = datetime.now(timezone.utc).isoformat()
+    state["last_poll"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
     save_state(state, cfg.STATE_DB_PATH)
     _clear_progress()
     logger.info("Delta sync complete: %d processed, %d errors", synced_count, error_count)
@@ -378,7 +474,7 @@ def _process_retry_queue(api_base, state):
     if not queue:
         return
 
-    now = datetime.now(timezone.utc).timestamp()
+    now = time.time()
     remaining = []
     for item in queue:
         if item.get("attempts", 0) >= 5:
@@ -399,7 +495,7 @@ def _process_retry_queue(api_base, state):
                     result = upload_file(api_base, item["path"], local_path)
                     if result:
                         stat = os.stat(local_path)
-                        local_mtime = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc).isoformat()
+                        local_mtime = _mtime_iso(stat.st_mtime)
                         remote_mtime = result.get("lastModifiedDateTime", "")
                         set_file_entry(state, item["path"], stat.st_size, local_mtime, remote_mtime)
                         logger.info("Retry succeeded: uploaded %s", item["path"])
@@ -418,20 +514,140 @@ def _process_retry_queue(api_base, state):
                     continue
             # If we got here, the action wasn't successful
             item["attempts"] = item.get("attempts", 0) + 1
-            item["next_retry"] = datetime.now(timezone.utc).timestamp() + min(2 ** item["attempts"] * 30, 1800)
+            item["next_retry"] = time.time() + min(2 ** item["attempts"] * 30, 1800)
             remaining.append(item)
         except Exception as e:
             logger.warning("Retry failed for %s: %s", item["path"], e)
             item["attempts"] = item.get("attempts", 0) + 1
             item["error"] = str(e)
-            item["next_retry"] = datetime.now(timezone.utc).timestamp() + min(2 ** item["attempts"] * 30, 1800)
+            item["next_retry"] = time.time() + min(2 ** item["attempts"] * 30, 1800)
             remaining.append(item)
 
     state["retry_queue"] = remaining
 
 
-def _sync_existing(api_base, state, rel_path, remote_info, local_info):
-    """Handle a file that exists in remote, local, AND state."""
+def _needs_hash_check(entry, remote_info, local_info):
+    """True if exactly one side's mtime changed but the remote hash did not.
+
+    That is usually a timezone or touch difference, so _sync_existing compares
+    local hashes before transferring anything. Remote-only touches are settled
+    by _remote_touch_only without hashing.
+    """
+    remote_changed = remote_info["lastModifiedDateTime"] != entry.get("remote_mtime", "")
+    local_changed = local_info["mtime"] != entry.get("local_mtime", "")
+    if remote_changed == local_changed:
+        return False
+    if _remote_touch_only(entry, remote_info, local_info):
+        return False
+    remote_hash = remote_info.get("remote_hash", "")
+    return bool(remote_hash) and remote_hash == entry.get("remote_hash", "")
+
+
+def _remote_touch_only(entry, remote_info, local_info):
+    """True if only the remote mtime moved: same remote hash, and the local
+    size and mtime still match state, so no local hash is needed to skip."""
+    if remote_info["lastModifiedDateTime"] == entry.get("remote_mtime", ""):
+        return False
+    if local_info["mtime"] != entry.get("local_mtime", "") or local_info["size"] != entry.get("size"):
+        return False
+    remote_hash = remote_info.get("remote_hash", "")
+    return bool(remote_hash) and remote_hash == entry.get("remote_hash", "")
+
+
+def _scan_local_files(root):
+    """Return {rel_path: {size, mtime}} for the syncable files below root.
+
+    Sibling directories are scanned concurrently so stat latency on network
+    and FUSE filesystems overlaps instead of adding up.
+    """
+    local_files = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, cfg.MAX_WORKERS)) as pool:
+        pending = {pool.submit(_scan_dir, root, "")}
+        while pending:
+            done, pending = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                dir_files, subdirs = future.result()
+                local_files.update(dir_files)
+                for sub_path, sub_rel in subdirs:
+                    pending.add(pool.submit(_scan_dir, sub_path, sub_rel))
+    return local_files
+
+
+def _scan_dir(dir_path, rel_dir):
+    """Scan one directory. Returns ({rel_path: {size, mtime}}, subdirectories).
+
+    Uses os.scandir so directory entries carry cached type info. Excluded
+    folders are pruned here rather than filtered file by file, and, as with
+    os.walk, symlinked directories are not followed.
+    Subdirectories are returned as (path, rel_path) pairs.
+    """
+    files = {}
+    subdirs = []
+    try:
+        with os.scandir(dir_path) as it:
+            entries = list(it)
+    except OSError as e:
+        logger.debug("Cannot list %s: %s", dir_path, e)
+        return files, subdirs
+    rel_prefix = rel_dir + "/" if rel_dir else ""
+    excluded = cfg.EXCLUDE_FOLDER_SET
+    for entry in entries:
+        rel_path = rel_prefix + entry.name
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        if is_dir:
+            if not entry.is_symlink() and rel_path not in excluded:
+                subdirs.append((entry.path, rel_path))
+            continue
+        if _should_ignore(rel_path) or not _is_in_sync_scope(rel_path):
+            continue
+        try:
+            stat = entry.stat()
+        except OSError as e:
+            logger.warning("Cannot stat %s: %s", entry.path, e)
+            continue
+        files[rel_path] = {
+            "size": stat.st_size,
+            "mtime": _mtime_iso(stat.st_mtime),
+        }
+    return files, subdirs
+
+
+def _precompute_hash_checks(state, actions):
+    """Run the _local_hash_matches calls full_sync's sync_existing actions will need.
+
+    Hashing is done up front on a pool sized to the CPU count (hashlib and
+    blake3 release the GIL), instead of interleaved with network transfers
+    on the I/O workers. Returns {rel_path: (matches, local_hash)}.
+    """
+    checks = []
+    for action_type, rel_path, remote_info, local_info in actions:
+        if action_type != "sync_existing":
+            continue
+        entry = state["files"][rel_path]
+        if _needs_hash_check(entry, remote_info, local_info):
+            checks.append((rel_path, entry.get("local_hash", "")))
+    if not checks:
+        return {}
+
+    def _check(item):
+        rel_path, stored_hash = item
+        return rel_path, _local_hash_matches(os.path.join(cfg.LOCAL_FOLDER, rel_path), stored_hash)
+
+    if len(checks) == 1:
+        return dict(map(_check, checks))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count() or 4) as pool:
+        return dict(pool.map(_check, checks))
+
+
+def _sync_existing(api_base, state, rel_path, remote_info, local_info, hash_check=None):
+    """Handle a file that exists in remote, local, AND state.
+
+    hash_check is a precomputed _local_hash_matches() result for the file.
+    """
     with _state_lock:
         entry = state["files"][rel_path]
     state_remote_mtime = entry.get("remote_mtime", "")
@@ -443,20 +659,27 @@ def _sync_existing(api_base, state, rel_path, remote_info, local_info):
     remote_changed = remote_mtime != state_remote_mtime
     local_changed = local_mtime != state_local_mtime
 
+    if _remote_touch_only(entry, remote_info, local_info):
+        logger.debug("Remote mtime changed but content did not, skipping: %s", rel_path)
+        with _state_lock:
+            set_file_entry(state, rel_path, entry["size"], local_mtime, remote_mtime,
+                           local_hash=entry.get("local_hash"), remote_hash=entry.get("remote_hash"))
+        return
+
     # Hash-based skip: if hashes match, skip transfer even if mtime differs
-    if (remote_changed or local_changed) and not (remote_changed and local_changed):
+    if _needs_hash_check(entry, remote_info, local_info):
         remote_hash = remote_info.get("remote_hash", "")
-        if remote_hash and remote_hash == entry.get("remote_hash", ""):
-            # Remote hash unchanged — likely just a timezone/touch difference
+        if hash_check is None:
             local_path = os.path.join(cfg.LOCAL_FOLDER, rel_path)
-            local_hash = _compute_local_hash(local_path)
-            if local_hash and local_hash == entry.get("local_hash", ""):
-                logger.debug("Hash match, skipping transfer: %s", rel_path)
-                with _state_lock:
-                    set_file_entry(state, rel_path, remote_info["size"],
-                                   local_mtime, remote_mtime,
-                                   local_hash=local_hash, remote_hash=remote_hash)
-                return
+            hash_check = _local_hash_matches(local_path, entry.get("local_hash", ""))
+        matches, local_hash = hash_check
+        if matches:
+            logger.debug("Hash match, skipping transfer: %s", rel_path)
+            with _state_lock:
+                set_file_entry(state, rel_path, remote_info["size"],
+                               local_mtime, remote_mtime,
+                               local_hash=local_hash, remote_hash=remote_hash)
+            return
 
     if remote_changed and local_changed:
         _handle_conflict(api_base, state, rel_path, remote_info, local_info)
@@ -464,11 +687,13 @@ def _sync_existing(api_base, state, rel_path, remote_info, local_info):
         local_path = os.path.join(cfg.LOCAL_FOLDER, rel_path)
         mark_recently_synced(rel_path)
         _set_progress(rel_path, "download")
+        hasher = _new_local_hasher()
         if download_file(api_base, rel_path, local_path,
-                         progress_cb=lambda done, total: _set_progress(rel_path, "download", done, total)):
+                         progress_cb=lambda done, total: _set_progress(rel_path, "download", done, total),
+                         hasher=hasher):
             stat = os.stat(local_path)
-            new_local_mtime = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc).isoformat()
-            local_hash = _compute_local_hash(local_path)
+            new_local_mtime = _mtime_iso(stat.st_mtime)
+            local_hash = _hasher_digest(hasher)
             with _state_lock:
                 set_file_entry(state, rel_path, remote_info["size"], new_local_mtime, remote_mtime,
                                local_hash=local_hash, remote_hash=remote_info.get("remote_hash"))
@@ -477,11 +702,13 @@ def _sync_existing(api_base, state, rel_path, remote_info, local_info):
     elif local_changed and not remote_changed:
         local_path = os.path.join(cfg.LOCAL_FOLDER, rel_path)
         _set_progress(rel_path, "upload")
+        hasher = _new_local_hasher()
         result = upload_file(api_base, rel_path, local_path,
-                             progress_cb=lambda done, total: _set_progress(rel_path, "upload", done, total))
+                             progress_cb=lambda done, total: _set_progress(rel_path, "upload", done, total),
+                             hasher=hasher)
         if result:
             new_remote_mtime = result.get("lastModifiedDateTime", remote_mtime)
-            local_hash = _compute_local_hash(local_path)
+            local_hash = _hasher_digest(hasher)
             remote_hash = ""
             hashes = result.get("file", {}).get("hashes", {})
             if hashes:
@@ -514,10 +741,11 @@ def _handle_conflict(api_base, state, rel_path, remote_info, local_info):
         pass
 
     mark_recently_synced(rel_path)
-    if download_file(api_base, rel_path, local_path):
+    hasher = _new_local_hasher()
+    if download_file(api_base, rel_path, local_path, hasher=hasher):
         stat = os.stat(local_path)
-        new_local_mtime = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc).isoformat()
-        local_hash = _compute_local_hash(local_path)
+        new_local_mtime = _mtime_iso(stat.st_mtime)
+        local_hash = _hasher_digest(hasher)
         with _state_lock:
             set_file_entry(state, rel_path, remote_info["size"], new_local_mtime,
                            remote_info["lastModifiedDateTime"],
@@ -545,7 +773,7 @@ def _handle_conflict_delta(api_base, state, rel_path, change):
     mark_recently_synced(rel_path)
     if download_file(api_base, rel_path, local_path):
         stat = os.stat(local_path)
-        new_local_mtime = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc).isoformat()
+        new_local_mtime = _mtime_iso(stat.st_mtime)
         with _state_lock:
             set_file_entry(state, rel_path, change["size"], new_local_mtime,
                            change["lastModifiedDateTime"],
@@ -584,11 +812,13 @@ def _download_new(api_base, state, rel_path, remote_info):
     local_path = os.path.join(cfg.LOCAL_FOLDER, rel_path)
     mark_recently_synced(rel_path)
     _set_progress(rel_path, "download")
+    hasher = _new_local_hasher()
     if download_file(api_base, rel_path, local_path,
-                     progress_cb=lambda done, total: _set_progress(rel_path, "download", done, total)):
+                     progress_cb=lambda done, total: _set_progress(rel_path, "download", done, total),
+                     hasher=hasher):
         stat = os.stat(local_path)
-        new_local_mtime = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc).isoformat()
-        local_hash = _compute_local_hash(local_path)
+        new_local_mtime = _mtime_iso(stat.st_mtime)
+        local_hash = _hasher_digest(hasher)
         with _state_lock:
             set_file_entry(state, rel_path, remote_info["size"], new_local_mtime,
                            remote_info["lastModifiedDateTime"],
@@ -601,11 +831,13 @@ def _upload_new(api_base, state, rel_path, local_info):
     """Upload a new local file (not in state or remote)."""
     local_path = os.path.join(cfg.LOCAL_FOLDER, rel_path)
     _set_progress(rel_path, "upload")
+    hasher = _new_local_hasher()
     result = upload_file(api_base, rel_path, local_path,
-                         progress_cb=lambda done, total: _set_progress(rel_path, "upload", done, total))
+                         progress_cb=lambda done, total: _set_progress(rel_path, "upload", done, total),
+                         hasher=hasher)
     if result:
         remote_mtime = result.get("lastModifiedDateTime", "")
-        local_hash = _compute_local_hash(local_path)
+        local_hash = _hasher_digest(hasher)
         remote_hash = ""
         hashes = result.get("file", {}).get("hashes", {})
         if hashes:
@@ -633,24 +865,23 @@ def handle_local_change(api_base, rel_path):
         return
 
     logger.info("Local change detected, uploading: %s", rel_path)
-    state = load_state(cfg.STATE_DB_PATH)
 
-    t0 = time.time()
+    t0 = time.monotonic()
     try:
-        result = upload_file(api_base, rel_path, local_path)
+        hasher = _new_local_hasher()
+        result = upload_file(api_base, rel_path, local_path, hasher=hasher)
         if result:
             stat = os.stat(local_path)
-            local_mtime = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc).isoformat()
+            local_mtime = _mtime_iso(stat.st_mtime)
             remote_mtime = result.get("lastModifiedDateTime", "")
-            local_hash = _compute_local_hash(local_path)
-            set_file_entry(state, rel_path, stat.st_size, local_mtime, remote_mtime,
-                           local_hash=local_hash)
-            save_state(state, cfg.STATE_DB_PATH)
+            local_hash = _hasher_digest(hasher)
+            record_file_entry(cfg.STATE_DB_PATH, rel_path, stat.st_size, local_mtime,
+                              remote_mtime, local_hash=local_hash)
             _log_history("upload", rel_path, "ok", size=stat.st_size,
-                         duration_ms=int((time.time() - t0) * 1000))
+                         duration_ms=int((time.monotonic() - t0) * 1000))
     except Exception as e:
         logger.error("Failed to upload %s on local change: %s", rel_path, e)
-        _log_history("upload", rel_path, "error", duration_ms=int((time.time() - t0) * 1000), error=str(e))
+        _log_history("upload", rel_path, "error", duration_ms=int((time.monotonic() - t0) * 1000), error=str(e))
 
 
 def handle_local_delete(api_base, rel_path):
@@ -665,14 +896,12 @@ def handle_local_delete(api_base, rel_path):
         return
 
     logger.info("Local delete detected, removing from remote: %s", rel_path)
-    state = load_state(cfg.STATE_DB_PATH)
 
-    t0 = time.time()
+    t0 = time.monotonic()
     try:
         delete_remote(api_base, rel_path)
-        remove_file_entry(state, rel_path)
-        save_state(state, cfg.STATE_DB_PATH)
-        _log_history("delete", rel_path, "ok", duration_ms=int((time.time() - t0) * 1000))
+        record_file_removal(cfg.STATE_DB_PATH, rel_path)
+        _log_history("delete", rel_path, "ok", duration_ms=int((time.monotonic() - t0) * 1000))
     except Exception as e:
         logger.error("Failed to delete remote %s: %s", rel_path, e)
-        _log_history("delete", rel_path, "error", duration_ms=int((time.time() - t0) * 1000), error=str(e))
+        _log_history("delete", rel_path, "error", duration_ms=int((time.monotonic() - t0) * 1000), error=str(e))
@@ -1,8 +1,11 @@
-"""Append-only JSONL sync history with rotation."""
+"""Sync history in a small SQLite table with rotation."""
 
+import atexit
 import json
 import logging
 import os
+import queue
+import sqlite3
 import threading
 import time
 
@@ -10,62 +13,143 @@ import config as cfg
 
 logger = logging.getLogger(__name__)
 
-HISTORY_PATH = os.path.join(cfg.DATA_DIR, "sync_history.jsonl")
+HISTORY_PATH = os.path.join(cfg.DATA_DIR, "sync_history.db")
+# Pre-SQLite history file, imported once and then removed
+LEGACY_HISTORY_PATH = os.path.join(cfg.DATA_DIR, "sync_history.jsonl")
 MAX_ENTRIES = 1000
+# Trim old rows once per this many inserts rather than on every event
+_ROTATE_EVERY = 100
 _lock = threading.Lock()
+_conn = None  # opened on first use; shared by all threads under _lock
+_inserts = 0
+
+# Sync workers only enqueue rows; one writer thread inserts them in batches
+_queue = queue.SimpleQueue()
+_writer = None
+_writer_start_lock = threading.Lock()
+
+_COLUMNS = ("timestamp", "action", "path", "status", "size", "duration_ms", "error")
 
 
 def log_event(action, path, status, size=None, duration_ms=None, error=None):
-    """Append a sync event to the history file."""
-    entry = {
-        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-        "action": action,
-        "path": path,
-        "status": status,
-        "size": size,
-        "duration_ms": duration_ms,
-        "error": error,
-    }
-    with _lock:
+    """Queue a sync event for the history table."""
+    _queue.put((time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                action, path, status, size, duration_ms, error))
+    if _writer is None:
+        _start_writer()
+
+
+def _start_writer():
+    global _writer
+    with _writer_start_lock:
+        if _writer is None:
+            _writer = threading.Thread(target=_writer_loop, name="sync-history", daemon=True)
+            _writer.start()
+
+
+def _writer_loop():
+    while True:
+        row = _queue.get()
+        with _lock:
+            _write_pending([row])
+
+
+def _write_pending(rows=None):
+    """Insert every queued event in one transaction; caller holds _lock."""
+    global _inserts
+    rows = rows or []
+    while True:
         try:
-            with open(HISTORY_PATH, "a", encoding="utf-8") as f:
-                f.write(json.dumps(entry) + "\n")
-            _rotate_if_needed()
-        except Exception as e:
-            logger.debug("Failed to write history: %s", e)
+            rows.append(_queue.get_nowait())
+        except queue.Empty:
+            break
+    if not rows:
+        return
+    try:
+        conn = _connection()
+        with conn:
+            conn.executemany(
+                "INSERT INTO events (timestamp, action, path, status, size, duration_ms, error)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            _inserts += len(rows)
+            if _inserts >= _ROTATE_EVERY:
+                _inserts = 0
+                _rotate(conn)
+    except Exception as e:
+        logger.debug("Failed to write history: %s", e)
+
+
+@atexit.register
+def _flush():
+    """Write out events still queued at exit."""
+    with _lock:
+        _write_pending()
 
 
 def get_history(limit=50, offset=0):
     """Read recent history entries (newest first)."""
-    if not os.path.exists(HISTORY_PATH):
-        return []
     with _lock:
+        # Include events the writer thread hasn't picked up yet
+        _write_pending()
         try:
-            with open(HISTORY_PATH, "r", encoding="utf-8") as f:
-                lines = f.readlines()
+            rows = _connection().execute(
+                "SELECT timestamp, action, path, status, size, duration_ms, error"
+                " FROM events ORDER BY id DESC LIMIT ? OFFSET ?",
+                (limit, offset)).fetchall()
         except Exception:
             return []
+    return [dict(zip(_COLUMNS, row)) for row in rows]
 
-    entries = []
-    for line in reversed(lines):
-        line = line.strip()
-        if not line:
-            continue
-        try:
-            entries.append(json.loads(line))
-        except json.JSONDecodeError:
-            continue
 
-    return entries[offset : offset + limit]
+def _connection():
+    """Return the shared connection, creating the table on first use; caller holds _lock."""
+    global _conn
+    if _conn is None:
+        conn = sqlite3.connect(HISTORY_PATH, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS events ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, action TEXT,"
+                " path TEXT, status TEXT, size INTEGER, duration_ms INTEGER, error TEXT)")
+            imported = _import_legacy(conn)
+        if imported:
+            try:
+                os.remove(LEGACY_HISTORY_PATH)
+            except OSError:
+                pass
+        _conn = conn
+    return _conn
+
 
+def _import_legacy(conn):
+    """Copy entries from the old JSONL history file into the table.
 
-def _rotate_if_needed():
-    """Keep only the last MAX_ENTRIES lines."""
+    Returns True if the file existed, so the caller can remove it once the
+    transaction has committed.
+    """
     try:
-        with open(HISTORY_PATH, "r", encoding="utf-8") as f:
+        with open(LEGACY_HISTORY_PATH, "r", encoding="utf-8") as f:
             lines = f.readlines()
-        if len(lines) > MAX_ENTRIES:
-            with open(HISTORY_PATH, "w", encoding="utf-8") as f:
-                f.writelines(lines[-MAX_ENTRIES:])
-    except Exception:
-        pass
+    except OSError:
+        return False
+    rows = []
+    for line in lines[-MAX_ENTRIES:]:
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if not isinstance(entry, dict):
+            continue
+        rows.append(tuple(entry.get(col) for col in _COLUMNS))
+    conn.executemany(
+        "INSERT INTO events (timestamp, action, path, status, size, duration_ms, error)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+    return True
+
+
+def _rotate(conn):
+    """Keep only the newest MAX_ENTRIES rows."""
+    conn.execute("DELETE FROM events WHERE id <= (SELECT MAX(id) FROM events) - ?",
+                 (MAX_ENTRIES,))
@@ -8,10 +8,20 @@ from datetime import datetime, timezone
 
 import config as cfg
 from onedrive_api import get_api_base, validate_share_link, list_remote_changes
-from state_db import load_state, save_state
+from state_db import load_state, save_state, state_signature
 from sync_engine import full_sync, delta_sync, get_current_op
 from file_watcher import start_watcher, stop_watcher
 
+try:
+    import health_monitor
+except ImportError:
+    health_monitor = None
+
+try:
+    import notify
+except ImportError:
+    notify = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,23 +33,38 @@ class SyncManager:
         self._connected = False
         self._api_base = None
         self._observer = None
-        self._poll_thread = None
+        # The one thread that runs syncs: poll-cycle delta syncs on a timer,
+        # full syncs when triggered, so syncs never overlap and need no lock.
+        # Each run gets fresh stop/wake events, so a worker still finishing a
+        # sync after stop() can never be revived by a later start()
+        self._sync_thread = None
         self._stop_event = threading.Event()
-        self._sync_lock = threading.Lock()
-        self._last_sync = None
-        self._next_sync = None
-        self._error = None
+        # Wakes the worker early. Requests made before it wakes collapse into
+        # one sync: a full sync if trigger_sync asked for one, else a delta
+        self._wake_event = threading.Event()
+        self._full_requested = False
+        # Status fields read by get_status; replaced whole by _publish so
+        # readers can take the reference without a lock
+        self._snapshot = {"last_sync": None, "next_sync": None, "error": None}
+        self._snapshot_lock = threading.Lock()
         self._consecutive_failures = 0
+        # (state_signature, file_count, retry_count) from the last status read
+        self._status_counts = (None, 0, 0)
+        self._status_lock = threading.Lock()
 
     @property
     def running(self):
         return self._running
 
     def start(self):
-        """Start sync: validate link, run initial sync, start watcher + poll loop."""
+        """Start sync: validate link, start watcher + poll loop, queue the initial sync."""
         if self._running:
             return {"ok": False, "error": "Already running"}
 
+        if self._sync_thread is not None and self._sync_thread.is_alive():
+            # stop() timed out waiting for a sync that can't be interrupted
+            return {"ok": False, "error": "Previous sync is still finishing, try again shortly"}
+
         if not cfg.SHARE_LINK:
             return {"ok": False, "error": "No share link configured"}
 
@@ -47,95 +72,77 @@ class SyncManager:
 
         logger.info("Validating share link...")
         if not validate_share_link(self._api_base):
-            self._error = "Share link validation failed"
-            return {"ok": False, "error": self._error}
+            error = "Share link validation failed"
+            self._publish(error=error)
+            return {"ok": False, "error": error}
 
         self._connected = True
-        self._error = None
+        self._publish(error=None)
         self._consecutive_failures = 0
 
         # Create local folder if needed
         os.makedirs(cfg.LOCAL_FOLDER, exist_ok=True)
 
-        # Ensure state DB exists
-        state = load_state(cfg.STATE_DB_PATH)
-        save_state(state, cfg.STATE_DB_PATH)
-
-        # Initial full sync (always full for first run)
-        logger.info("Running initial full sync...")
-        with self._sync_lock:
-            try:
-                synced, errors = full_sync(self._api_base)
-                self._last_sync = datetime.now(timezone.utc)
-                self._record_successful_sync()
-                # Initialize delta link for subsequent delta syncs
-                self._init_delta_link()
-                self._notify_sync_complete(synced)
-            except Exception as e:
-                logger.error("Initial sync failed: %s", e)
-
         # Start file watcher
         self._observer = start_watcher(self._api_base)
 
-        # Start poll thread
-        self._stop_event.clear()
-        self._poll_thread = threading.Thread(target=self._poll_loop, daemon=True)
-        self._poll_thread.start()
+        # Start the sync worker; its first run is the initial full sync, so
+        # start() returns without waiting for it
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._full_requested = False
+        self._sync_thread = threading.Thread(
+            target=self._sync_loop, args=(self._stop_event, self._wake_event), daemon=True)
+        self._sync_thread.start()
 
         self._running = True
         logger.info("Sync engine started")
-        return {"ok": True}
+        return {"ok": True, "status": "syncing"}
 
     def stop(self):
-        """Stop sync: signal stop, stop watcher, join poll thread."""
+        """Stop sync: signal stop, stop watcher, join the sync worker."""
         if not self._running:
             return {"ok": False, "error": "Not running"}
 
         self._stop_event.set()
+        self._wake_event.set()
 
         if self._observer:
             stop_watcher(self._observer)
             self._observer = None
 
-        if self._poll_thread:
-            self._poll_thread.join(timeout=10)
-            self._poll_thread = None
+        if self._sync_thread:
+            self._sync_thread.join(timeout=10)
+            if not self._sync_thread.is_alive():
+                self._sync_thread = None
 
         self._running = False
         self._connected = False
-        self._next_sync = None
+        self._publish(next_sync=None)
         logger.info("Sync engine stopped")
         return {"ok": True}
 
     def trigger_sync(self):
-        """Run full_sync() immediately in a background thread."""
+        """Ask the background worker to run full_sync() as soon as possible."""
         if not self._running:
             return {"ok": False, "error": "Sync engine not running"}
 
-        def _run():
-            with self._sync_lock:
-                try:
-                    synced, errors = full_sync(self._api_base)
-                    self._last_sync = datetime.now(timezone.utc)
-                    self._record_successful_sync()
-                    self._notify_sync_complete(synced)
-                except Exception as e:
-                    logger.error("Manual sync failed: %s", e)
-
-        t = threading.Thread(target=_run, daemon=True)
-        t.start()
+        self._full_requested = True
+        self._wake_event.set()
+        return {"ok": True}
+
+    def wake_poll(self):
+        """Run the next poll-cycle delta sync now, e.g. on a remote change notification."""
+        if not self._running:
+            return {"ok": False, "error": "Sync engine not running"}
+
+        self._wake_event.set()
         return {"ok": True}
 
     def get_status(self):
         """Return current status as a dict."""
-        file_count = 0
-        retry_count = 0
-        try:
-            state = load_state(cfg.STATE_DB_PATH)
-            file_count = len(state.get("files", {}))
-            retry_count = len(state.get("retry_queue", []))
-        except Exception:
-            pass
+        snap = self._snapshot
+        file_count, retry_count = self._state_counts()
 
         # Include progress info
         op = get_current_op()
@@ -143,17 +150,38 @@ class SyncManager:
         return {
             "running": self._running,
             "connected": self._connected,
-            "last_sync": self._last_sync.isoformat() if self._last_sync else None,
-            "next_sync": self._next_sync.isoformat() if self._next_sync else None,
+            "last_sync": snap["last_sync"],
+            "next_sync": snap["next_sync"],
             "file_count": file_count,
             "retry_count": retry_count,
             "poll_interval": cfg.POLL_INTERVAL,
             "local_folder": cfg.LOCAL_FOLDER,
             "share_link_set": bool(cfg.SHARE_LINK),
-            "error": self._error,
+            "error": snap["error"],
             "current_op": op,
         }
 
+    def _publish(self, **changes):
+        """Replace the status snapshot with one that has `changes` applied."""
+        with self._snapshot_lock:
+            self._snapshot = {**self._snapshot, **changes}
+
+    def _state_counts(self):
+        """Return (file_count, retry_count), reloading state only when its files changed."""
+        sig = state_signature(cfg.STATE_DB_PATH)
+        with self._status_lock:
+            cached_sig, file_count, retry_count = self._status_counts
+            if sig == cached_sig:
+                return file_count, retry_count
+            try:
+                state = load_state(cfg.STATE_DB_PATH)
+                file_count = len(state.get("files", {}))
+                retry_count = len(state.get("retry_queue", []))
+            except Exception:
+                return 0, 0
+            self._status_counts = (sig, file_count, retry_count)
+            return file_count, retry_count
+
     def _init_delta_link(self):
         """Initialize delta link if not already present."""
         try:
@@ -171,53 +199,55 @@ class SyncManager:
     def _record_successful_sync(self):
         """Record a successful sync for health monitoring."""
         self._consecutive_failures = 0
-        try:
-            import health_monitor
+        if health_monitor is not None:
             health_monitor.record_successful_sync()
-        except Exception:
-            pass
 
     def _notify_sync_complete(self, count):
         """Send desktop notification after sync."""
-        try:
-            import notify
+        # notify swallows and logs its own delivery failures
+        if notify is not None:
             notify.notify_sync_complete(count)
-        except Exception:
-            pass
 
     def _notify_error(self, message):
         """Send desktop notification for repeated errors."""
-        try:
-            import notify
+        if notify is not None:
             notify.notify_error(message)
-        except Exception:
-            pass
 
-    def _poll_loop(self):
-        """Poll loop that sleeps in 1-second increments for responsive shutdown."""
-        while not self._stop_event.is_set():
+    def _sync_loop(self, stop_event, wake_event):
+        """Run the initial full sync, then a delta sync every POLL_INTERVAL (or
+        when woken) and a full sync whenever triggered, until stop_event is set."""
+        self._run_sync("initial")
+        while not stop_event.is_set():
             # Calculate next sync time
             poll_end = time.time() + cfg.POLL_INTERVAL
-            self._next_sync = datetime.fromtimestamp(poll_end, tz=timezone.utc)
-
-            # Sleep in 1-second increments
-            for _ in range(cfg.POLL_INTERVAL):
-                if self._stop_event.is_set():
-                    return
-                time.sleep(1)
+            self._publish(next_sync=datetime.fromtimestamp(poll_end, tz=timezone.utc).isoformat())
 
-            if self._stop_event.is_set():
+            wake_event.wait(timeout=cfg.POLL_INTERVAL)
+            if stop_event.is_set():
                 return
+            wake_event.clear()
+            full, self._full_requested = self._full_requested, False
+            self._run_sync("manual" if full else "poll")
 
-            with self._sync_lock:
-                try:
-                    # Use delta sync for poll cycles (falls back to full if needed)
-                    synced, errors = delta_sync(self._api_base)
-                    self._last_sync = datetime.now(timezone.utc)
-                    self._record_successful_sync()
-                    self._notify_sync_complete(synced)
-                except Exception as e:
-                    logger.error("Poll sync failed: %s", e)
-                    self._consecutive_failures += 1
-                    if self._consecutive_failures >= 3:
-                        self._notify_error(f"Sync failing repeatedly: {e}")
+    def _run_sync(self, kind):
+        """Run one sync on the worker thread: "initial", "manual" or "poll"."""
+        try:
+            if kind == "poll":
+                # Use delta sync for poll cycles (falls back to full if needed)
+                synced, errors = delta_sync(self._api_base)
+            else:
+                if kind == "initial":
+                    logger.info("Running initial full sync...")
+                synced, errors = full_sync(self._api_base)
+            self._publish(last_sync=datetime.now(timezone.utc).isoformat())
+            self._record_successful_sync()
+            if kind == "initial":
+                # Initialize delta link for subsequent delta syncs
+                self._init_delta_link()
+            self._notify_sync_complete(synced)
+        except Exception as e:
+            logger.error("%s sync failed: %s", kind.capitalize(), e)
+            if kind == "poll":
+                self._consecutive_failures += 1
+                if self._consecutive_failures >= 3:
+                    self._notify_error(f"Sync failing repeatedly: {e}")
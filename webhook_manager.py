@@ -4,13 +4,27 @@ Graph API requires a publicly-accessible callback URL for subscriptions,
 so this is only useful when exposed via ngrok/tunnel. Polling remains default.
 """
 
+import functools
 import logging
+import threading
 import time
+from datetime import datetime, timedelta, timezone
 
 import config as cfg
 
 logger = logging.getLogger(__name__)
 
+# Shared secret echoed back by Graph in every notification
+_CLIENT_STATE = "autosync-webhook-secret"
+
+# Changed resources waiting for the batch worker, and the sync callback it runs
+_pending = set()
+_pending_lock = threading.Lock()
+_trigger = None
+_wake = threading.Event()  # set when _pending goes non-empty
+_full = threading.Event()  # set when _pending reaches WEBHOOK_BATCH_MAX
+_worker = None
+
 
 def subscribe(api_base, notification_url):
     """Create a subscription for file change notifications.
@@ -27,13 +41,8 @@ def subscribe(api_base, notification_url):
         logger.error("Cannot subscribe: drive base not resolved")
         return None
 
-    # Extract driveId from drive_base URL
-    # Format: .../drives/{driveId}/items/{itemId}
-    parts = drive_base.split("/")
-    try:
-        drive_idx = parts.index("drives")
-        drive_id = parts[drive_idx + 1]
-    except (ValueError, IndexError):
+    drive_id = _drive_id(drive_base)
+    if drive_id is None:
         logger.error("Cannot parse driveId from drive base: %s", drive_base)
         return None
 
@@ -42,7 +51,7 @@ def subscribe(api_base, notification_url):
         "notificationUrl": notification_url,
         "resource": f"/drives/{drive_id}/root",
         "expirationDateTime": _expiry_iso(),
-        "clientState": "autosync-webhook-secret",
+        "clientState": _CLIENT_STATE,
     }
 
     resp = _request_with_retry("POST", f"{cfg.GRAPH_API_BASE}/subscriptions", json=body)
@@ -54,6 +63,19 @@ def subscribe(api_base, notification_url):
     return None
 
 
+@functools.lru_cache(maxsize=16)
+def _drive_id(drive_base):
+    """Extract driveId from a drive base URL, or None if it has none.
+
+    Format: .../drives/{driveId}/items/{itemId}
+    """
+    parts = drive_base.split("/")
+    try:
+        return parts[parts.index("drives") + 1]
+    except (ValueError, IndexError):
+        return None
+
+
 def renew(subscription_id):
     """Renew an existing subscription."""
     from onedrive_api import _request_with_retry
@@ -71,23 +93,123 @@ def renew(subscription_id):
     return False
 
 
+# Graph accepts at most 20 requests per JSON batch
+_BATCH_LIMIT = 20
+# Renew 12 hours before the 3-day expiry set by _expiry_iso
+_RENEW_INTERVAL = (3 * 24 - 12) * 3600
+
+
+def renew_all(subscription_ids):
+    """Renew several subscriptions with Graph $batch requests.
+
+    Returns the set of subscription IDs that were renewed.
+    """
+    from onedrive_api import _request_with_retry
+
+    renewed = set()
+    ids = list(subscription_ids)
+    expiry = _expiry_iso()
+    for start in range(0, len(ids), _BATCH_LIMIT):
+        chunk = ids[start:start + _BATCH_LIMIT]
+        body = {"requests": [
+            {
+                "id": str(i),
+                "method": "PATCH",
+                "url": f"/subscriptions/{sid}",
+                "body": {"expirationDateTime": expiry},
+                "headers": {"Content-Type": "application/json"},
+            }
+            for i, sid in enumerate(chunk)
+        ]}
+        resp = _request_with_retry("POST", f"{cfg.GRAPH_API_BASE}/$batch", json=body)
+        if resp.status_code != 200:
+            logger.error("Webhook batch renew failed: %s %s", resp.status_code, resp.text[:200])
+            continue
+        for item in resp.json().get("responses", []):
+            sid = chunk[int(item["id"])]
+            if item.get("status") == 200:
+                renewed.add(sid)
+            else:
+                logger.error("Webhook renew failed for %s: %s", sid, item.get("status"))
+    if renewed:
+        logger.info("Webhook subscriptions renewed: %d of %d", len(renewed), len(ids))
+    return renewed
+
+
+def start_renewal_thread(subscription_ids):
+    """Renew the given subscriptions every _RENEW_INTERVAL seconds.
+
+    Returns a threading.Event; set it to stop renewing.
+    """
+    ids = list(subscription_ids)
+    stop = threading.Event()
+
+    def _run():
+        while not stop.wait(_RENEW_INTERVAL):
+            try:
+                renew_all(ids)
+            except Exception as e:
+                logger.error("Webhook renewal failed: %s", e)
+
+    threading.Thread(target=_run, name="webhook-renew", daemon=True).start()
+    return stop
+
+
 def handle_notification(data):
     """Process incoming webhook notification data.
 
-    Returns list of resource URLs that changed.
+    Returns the set of resource URLs that changed.
     """
-    changed = []
-    for item in data.get("value", []):
-        if item.get("clientState") != "autosync-webhook-secret":
+    changed = set()
+    for item in data.get("value", ()):
+        if item.get("clientState") != _CLIENT_STATE:
             logger.warning("Webhook notification with invalid clientState")
             continue
-        resource = item.get("resource", "")
-        changed.append(resource)
-        logger.info("Webhook notification for resource: %s", resource)
+        resource = item.get("resource")
+        if resource:
+            changed.add(resource)
+            logger.info("Webhook notification for resource: %s", resource)
     return changed
 
 
+def schedule_sync(resources, trigger):
+    """Queue changed resources; trigger() runs once per burst of notifications.
+
+    The first notification starts a WEBHOOK_BATCH_INTERVAL window (cut short
+    once WEBHOOK_BATCH_MAX resources are pending), and everything received
+    in that window is covered by a single trigger() call.
+    """
+    global _trigger, _worker
+    if not resources:
+        return
+    with _pending_lock:
+        _pending.update(resources)
+        _trigger = trigger
+        if len(_pending) >= cfg.WEBHOOK_BATCH_MAX:
+            _full.set()
+        _wake.set()
+        if _worker is None:
+            _worker = threading.Thread(target=_batch_loop, name="webhook-batch", daemon=True)
+            _worker.start()
+
+
+def _batch_loop():
+    while True:
+        _wake.wait()
+        _full.wait(timeout=cfg.WEBHOOK_BATCH_INTERVAL)
+        with _pending_lock:
+            count = len(_pending)
+            _pending.clear()
+            _wake.clear()
+            _full.clear()
+            trigger = _trigger
+        logger.info("Webhook: %d changed resource(s), triggering sync", count)
+        try:
+            trigger()
+        except Exception as e:
+            logger.error("Webhook-triggered sync failed: %s", e)
+
+
 def _expiry_iso():
     """Return an ISO timestamp ~3 days from now (max Graph subscription lifetime)."""
-    from datetime import datetime, timezone, timedelta
     return (datetime.now(timezone.utc) + timedelta(days=3)).isoformat()
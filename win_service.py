@@ -1,8 +1,10 @@
 """Windows auto-start via Startup folder shortcut."""
 
+import functools
 import logging
 import os
 import sys
+import time
 
 import config as cfg
 
@@ -16,9 +18,14 @@ _STARTUP_DIR = os.path.join(
 _SHORTCUT_NAME = "AutoSync.vbs"
 _SHORTCUT_PATH = os.path.join(_STARTUP_DIR, _SHORTCUT_NAME)
 
+# Last known install state: (installed, monotonic time checked)
+_install_state = (None, 0.0)
+_INSTALL_STATE_TTL = 5
 
+
+@functools.lru_cache(maxsize=None)
 def _vbs_content():
-    """Generate a VBScript that launches AutoSync without a console window."""
+    """Generate a VBScript that launches AutoSync without a console window; inputs are fixed per process."""
     if getattr(sys, "frozen", False):
         command = f'"{sys.executable}"'
         working_dir = cfg.DATA_DIR
@@ -39,8 +46,15 @@ def install():
     """Create a VBScript in the Startup folder to launch AutoSync on login."""
     try:
         os.makedirs(_STARTUP_DIR, exist_ok=True)
-        with open(_SHORTCUT_PATH, "w", encoding="utf-8") as f:
+        # Write beside the target and swap it in, so an interrupted install
+        # never leaves a truncated script in the Startup folder
+        tmp_path = _SHORTCUT_PATH + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
             f.write(_vbs_content())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, _SHORTCUT_PATH)
+        _set_install_state(True)
         logger.info("Windows Startup shortcut installed: %s", _SHORTCUT_PATH)
         return True
     except Exception as e:
@@ -53,6 +67,7 @@ def uninstall():
     if os.path.exists(_SHORTCUT_PATH):
         try:
             os.remove(_SHORTCUT_PATH)
+            _set_install_state(False)
             logger.info("Windows Startup shortcut removed: %s", _SHORTCUT_PATH)
             return True
         except Exception as e:
@@ -62,5 +77,15 @@ def uninstall():
 
 
 def is_installed():
-    """Check if the Startup shortcut exists."""
-    return os.path.exists(_SHORTCUT_PATH)
+    """Check if the Startup shortcut exists, cached for _INSTALL_STATE_TTL seconds."""
+    installed, checked_at = _install_state
+    if installed is not None and time.monotonic() - checked_at < _INSTALL_STATE_TTL:
+        return installed
+    installed = os.path.exists(_SHORTCUT_PATH)
+    _set_install_state(installed)
+    return installed
+
+
+def _set_install_state(installed):
+    global _install_state
+    _install_state = (installed, time.monotonic())